@@ -2,6 +2,9 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Seat event streams (``show_sessions/<id>/events/``) hold their connection
+open and are only served through this application; WSGI workers answer
+them with 501.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -0,0 +1,185 @@
+"""
+Composite endpoint running several API reads in one round trip.
+
+``POST /api/batch/`` with ``{"requests": ["/api/planetarium/show_themes/",
+...], "parallel": false}`` resolves every path and calls its DRF view
+directly, skipping the middleware. The batch request is authenticated
+once and its user is passed on to every sub-request. Throttles and
+permissions still apply to each sub-request, so a batch gets no more
+than the same requests made one by one. With ``parallel``, the
+sub-requests run in a pool of ``BATCH_MAX_WORKERS`` threads shared by
+every batch of the process. Each thread keeps its database connection
+between batches, subject to ``CONN_MAX_AGE`` like request threads, so
+parallel batches do not pay for new connections. The response lists
+``{"path", "status", "body"}`` in request order.
+"""
+
+import copy
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.http import QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.openapi import OpenApiTypes, extend_schema
+
+logger = logging.getLogger(__name__)
+
+
+def _sub_request(request, path, query):
+    """Return a GET request for ``path`` sharing the batch's headers and user."""
+    sub_request = copy.copy(request._request)
+    sub_request.method = "GET"
+    sub_request.path = sub_request.path_info = path
+    sub_request.META = {
+        **request._request.META,
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "CONTENT_LENGTH": "0",
+    }
+    sub_request.GET = QueryDict(query)
+    # DRF skips authentication for requests carrying a forced user.
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def dispatch(request, path) -> dict:
+    """Run ``path`` as a GET request and return its status and body."""
+    url = urlsplit(path)
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        return {"path": path, "status": 404, "body": {"detail": "Not found."}}
+    view_class = getattr(match.func, "cls", None)
+    if (
+        view_class is None
+        or not issubclass(view_class, APIView)
+        or issubclass(view_class, BatchView)
+    ):
+        return {
+            "path": path,
+            "status": 400,
+            "body": {"detail": "This path cannot be batched."},
+        }
+    sub_request = _sub_request(request, url.path, url.query)
+    sub_request.resolver_match = match
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Batched request for %s failed", path)
+        return {"path": path, "status": 500, "body": {"detail": "Server error."}}
+    return {
+        "path": path,
+        "status": response.status_code,
+        "body": getattr(response, "data", None),
+    }
+
+
+def _dispatch_in_thread(request, path):
+    close_old_connections()
+    try:
+        return dispatch(request, path)
+    finally:
+        close_old_connections()
+
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process's pool of batch threads, starting it if needed."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None:
+            _executor_workers = settings.BATCH_MAX_WORKERS
+            _executor = ThreadPoolExecutor(
+                _executor_workers, thread_name_prefix="batch"
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Close the database connections of the batch threads and stop them."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+        workers = _executor_workers
+    if executor is None:
+        return
+    # Every task waits for all the others, so each runs on its own thread.
+    barrier = threading.Barrier(workers)
+
+    def close_connections():
+        barrier.wait()
+        connections.close_all()
+
+    for _ in range(workers):
+        executor.submit(close_connections)
+    executor.shutdown(wait=True)
+
+
+class BatchView(APIView):
+    """Run several GET requests of the API in one round trip."""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {
+                    "requests": {"type": "array", "items": {"type": "string"}},
+                    "parallel": {"type": "boolean"},
+                },
+                "required": ["requests"],
+            }
+        },
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+    )
+    def post(self, request):
+        """
+        Return the response of every path in ``requests``, in order.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        paths = data.get("requests")
+        if (
+            not isinstance(paths, list)
+            or not paths
+            or not all(isinstance(path, str) for path in paths)
+        ):
+            return Response(
+                {"requests": "Expected a non-empty list of paths."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(paths) > settings.BATCH_MAX_REQUESTS:
+            return Response(
+                {
+                    "requests": f"At most {settings.BATCH_MAX_REQUESTS} "
+                    f"requests can be batched."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if data.get("parallel") and len(paths) > 1:
+            executor = get_executor()
+            futures = [
+                executor.submit(copy_context().run, _dispatch_in_thread, request, path)
+                for path in paths
+            ]
+            responses = [future.result() for future in futures]
+        else:
+            responses = [dispatch(request, path) for path in paths]
+        return Response({"responses": responses})
@@ -0,0 +1,275 @@
+"""
+Priority load shedding for overloaded workers.
+
+``PriorityLoadSheddingMiddleware`` keeps two load signals per worker
+process: the requests in flight, and the database queries running at
+once, which stands in for pool saturation as Django keeps one connection
+per thread. Load is the larger of the two as a fraction of
+``LOAD_SHEDDING_MAX_IN_FLIGHT`` and ``LOAD_SHEDDING_MAX_ACTIVE_QUERIES``;
+both only move in threaded or ASGI workers.
+
+Routes are ranked booking > seat map > catalog > docs, and a request is
+shed once load reaches the threshold of its priority in
+``LOAD_SHEDDING_THRESHOLDS``; bookings are never shed. A shed catalog or
+seat map read is answered from the last copy of the same URL kept in the
+cache for ``LOAD_SHEDDING_STALE_SECONDS`` if there is one and its JWT is
+valid, and with ``503`` and ``Retry-After`` otherwise. A worker rewrites
+a copy at most every ``LOAD_SHEDDING_STALE_REFRESH_SECONDS``. Every decision is
+counted in per-process metrics, see ``metrics()``.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from config.openapi import OpenApiTypes, extend_schema
+
+BOOKING = "booking"
+SEAT_MAP = "seat_map"
+CATALOG = "catalog"
+DOCS = "docs"
+PRIORITIES = (BOOKING, SEAT_MAP, CATALOG, DOCS)
+
+SERVED = "served"
+STALE = "stale"
+SHED = "shed"
+
+SEAT_MAP_VIEWS = {
+    "planetarium:showsession-detail",
+    "planetarium:showsession-events",
+    "planetarium:showsession-waiting-room",
+}
+DOCS_VIEWS = {"schema", "swagger-ui", "redoc"}
+# Ranked with bookings so that overload stays observable.
+NEVER_SHED_VIEWS = {"load-shedding-metrics"}
+# Writes that only read, ranked by what they serve.
+CATALOG_VIEWS = {"batch"}
+# Reads whose response is the same for every user, so that a stale copy
+# can be served to anyone authenticated.
+STALE_CACHEABLE_VIEWS = {
+    f"planetarium:{name}"
+    for name in (
+        "astronomyshow-list",
+        "astronomyshow-detail",
+        "showtheme-list",
+        "showtheme-detail",
+        "planetariumdome-list",
+        "planetariumdome-detail",
+        "showsession-list",
+        "showsession-detail",
+    )
+}
+
+_lock = threading.Lock()
+_in_flight = 0
+_active_queries = 0
+_decisions = Counter()
+# When this worker last wrote the stale copy of each URL, oldest first.
+_stale_written = OrderedDict()
+STALE_WRITTEN_SIZE = 1024
+
+
+def classify(request, view_name) -> str:
+    """Return the priority of a request for the view named ``view_name``."""
+    if view_name in DOCS_VIEWS:
+        return DOCS
+    if view_name in CATALOG_VIEWS:
+        return CATALOG
+    if (
+        request.method not in SAFE_METHODS
+        or view_name in NEVER_SHED_VIEWS
+        or view_name.startswith("user:")
+    ):
+        return BOOKING
+    if view_name in SEAT_MAP_VIEWS:
+        return SEAT_MAP
+    return CATALOG
+
+
+def _count_query(execute, sql, params, many, context):
+    global _active_queries
+    with _lock:
+        _active_queries += 1
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        with _lock:
+            _active_queries -= 1
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def current_load() -> float:
+    """Return the worker's load as a fraction of its limits."""
+    return max(
+        _in_flight / settings.LOAD_SHEDDING_MAX_IN_FLIGHT,
+        _active_queries / settings.LOAD_SHEDDING_MAX_ACTIVE_QUERIES,
+    )
+
+
+def metrics() -> dict:
+    """Return this worker's load and its decisions per priority."""
+    with _lock:
+        decisions = {
+            priority: {
+                decision: _decisions[priority, decision]
+                for decision in (SERVED, STALE, SHED)
+            }
+            for priority in PRIORITIES
+        }
+        return {
+            "pid": os.getpid(),
+            "in_flight": _in_flight,
+            "active_queries": _active_queries,
+            "load": round(current_load(), 3),
+            "decisions": decisions,
+        }
+
+
+def _stale_key(request):
+    url = f"{request.get_full_path()} {request.headers.get('Accept', '')}"
+    return f"load_shedding:stale:{hashlib.sha256(url.encode()).hexdigest()}"
+
+
+def _is_authenticated(request):
+    try:
+        return bool(JWTStatelessUserAuthentication().authenticate(request))
+    except AuthenticationFailed:
+        return False
+
+
+class PriorityLoadSheddingMiddleware:
+    """Shed low priority requests when the worker is overloaded."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.LOAD_SHEDDING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(
+            _install_query_counter, dispatch_uid="load_shedding_query_counter"
+        )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self._enter()
+        try:
+            response = self.get_response(request)
+        finally:
+            self._leave()
+        self._keep_stale_copy(request, response)
+        return response
+
+    async def __acall__(self, request):
+        self._enter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._leave()
+        self._keep_stale_copy(request, response)
+        return response
+
+    @staticmethod
+    def _enter():
+        global _in_flight
+        with _lock:
+            _in_flight += 1
+
+    @staticmethod
+    def _leave():
+        global _in_flight
+        with _lock:
+            _in_flight -= 1
+
+    @staticmethod
+    def _keep_stale_copy(request, response):
+        key = getattr(request, "load_shedding_stale_key", None)
+        if not key or response.status_code != 200 or response.streaming:
+            return
+        now = time.monotonic()
+        with _lock:
+            written = _stale_written.get(key)
+            if (
+                written is not None
+                and now - written < settings.LOAD_SHEDDING_STALE_REFRESH_SECONDS
+            ):
+                return
+            _stale_written[key] = now
+            _stale_written.move_to_end(key)
+            while len(_stale_written) > STALE_WRITTEN_SIZE:
+                _stale_written.popitem(last=False)
+        cache.set(
+            key,
+            (response.content, response["Content-Type"]),
+            settings.LOAD_SHEDDING_STALE_SECONDS,
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        priority = classify(request, view_name)
+        request.load_shedding_stale_key = None
+        if request.method == "GET" and view_name in STALE_CACHEABLE_VIEWS:
+            request.load_shedding_stale_key = _stale_key(request)
+
+        threshold = settings.LOAD_SHEDDING_THRESHOLDS.get(priority)
+        if threshold is None or current_load() < threshold:
+            self._record(priority, SERVED)
+            return None
+
+        if request.load_shedding_stale_key and _is_authenticated(request):
+            stale = cache.get(request.load_shedding_stale_key)
+            if stale is not None:
+                content, content_type = stale
+                self._record(priority, STALE)
+                request.load_shedding_stale_key = None
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Load-Shedding"] = STALE
+                return response
+
+        self._record(priority, SHED)
+        request.load_shedding_stale_key = None
+        response = JsonResponse(
+            {"detail": "The service is overloaded, please retry later."},
+            status=503,
+        )
+        response["Retry-After"] = str(settings.LOAD_SHEDDING_RETRY_AFTER)
+        response["X-Load-Shedding"] = SHED
+        return response
+
+    @staticmethod
+    def _record(priority, decision):
+        with _lock:
+            _decisions[priority, decision] += 1
+
+
+class LoadSheddingMetricsView(APIView):
+    """Report the load and load shedding decisions of this worker process."""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        return Response(metrics())
@@ -0,0 +1,33 @@
+"""
+Schema annotations that cost nothing where the schema is not served.
+
+Views take ``extend_schema``, ``OpenApiParameter`` and ``OpenApiTypes``
+from here. They are drf_spectacular's when it is installed, and inert
+stand-ins otherwise, so that profiles leaving it out of INSTALLED_APPS
+(``config.settings_api``) never import it.
+"""
+
+from django.conf import settings
+
+if "drf_spectacular" in settings.INSTALLED_APPS:
+    from drf_spectacular.types import OpenApiTypes  # noqa: F401
+    from drf_spectacular.utils import OpenApiParameter, extend_schema  # noqa: F401
+else:
+
+    class _OpenApiTypes:
+        def __getattr__(self, name):
+            return name
+
+    OpenApiTypes = _OpenApiTypes()
+
+    class OpenApiParameter:
+        QUERY = "query"
+        PATH = "path"
+        HEADER = "header"
+        COOKIE = "cookie"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    def extend_schema(*args, **kwargs):
+        return lambda target: target
@@ -0,0 +1,180 @@
+"""
+On-demand profiling of live requests.
+
+With ``PROFILING_ENABLED``, ``RequestProfilingMiddleware`` profiles a
+request when it carries an ``X-Profile`` header holding a token from
+``python manage.py profiling_token``, which signs the id of a staff user
+and a mode, and is accepted for ``PROFILING_TOKEN_MAX_AGE`` seconds while
+that user is still active staff. ``PROFILING_SAMPLE_RATE = N`` also
+profiles every Nth request of each worker in ``PROFILING_SAMPLE_MODE``.
+
+``cprofile`` runs the deterministic profiler and writes a pstats file;
+``sample`` records the request thread's stack every
+``PROFILING_SAMPLE_INTERVAL`` seconds from a separate thread and writes
+collapsed stacks, one ``frame;frame;... count`` line per stack, as read
+by flame graph tools. Profiles go to ``PROFILING_DIR``, which keeps at
+most ``PROFILING_MAX_FILES`` files, none older than
+``PROFILING_MAX_AGE_DAYS``; the file name is returned in the
+``X-Profile-Id`` response header. When profiling is disabled the
+middleware is not loaded at all.
+"""
+
+import cProfile
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+PROFILE_HEADER = "X-Profile"
+CPROFILE = "cprofile"
+SAMPLE = "sample"
+_SALT = "config.profiling"
+
+
+def make_token(user, mode) -> str:
+    """Return an ``X-Profile`` token of ``user`` for profiles in ``mode``."""
+    return signing.dumps({"user": user.id, "mode": mode}, salt=_SALT)
+
+
+def read_token(token):
+    """Return the mode of a valid token of an active staff user, or None."""
+    try:
+        data = signing.loads(
+            token, salt=_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    if data.get("mode") not in PROFILERS:
+        return None
+    is_staff = (
+        get_user_model()
+        .objects.filter(id=data.get("user"), is_staff=True, is_active=True)
+        .exists()
+    )
+    return data["mode"] if is_staff else None
+
+
+class CProfileProfiler:
+    """Deterministic profile of every call, saved as pstats."""
+
+    suffix = ".prof"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+
+class SamplingProfiler(threading.Thread):
+    """Periodic samples of one thread's stack, saved as collapsed stacks."""
+
+    suffix = ".collapsed"
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(settings.PROFILING_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                    f":{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def save(self, path):
+        with open(path, "w") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+PROFILERS = {CPROFILE: CProfileProfiler, SAMPLE: SamplingProfiler}
+
+
+def apply_retention(directory) -> None:
+    """Delete profiles beyond the newest ``PROFILING_MAX_FILES`` or too old."""
+    oldest = time.time() - settings.PROFILING_MAX_AGE_DAYS * 86400
+    profiles = sorted(
+        (
+            path
+            for path in directory.iterdir()
+            if path.suffix in (".prof", ".collapsed")
+        ),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for index, path in enumerate(profiles):
+        if index >= settings.PROFILING_MAX_FILES or path.stat().st_mtime < oldest:
+            path.unlink(missing_ok=True)
+
+
+class RequestProfilingMiddleware:
+    """Profile requests asking for it with a token, or one in N."""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.requests = itertools.count(1)
+
+    def requested_mode(self, request):
+        """Return the profiler mode for ``request``, or None."""
+        token = request.headers.get(PROFILE_HEADER)
+        if token:
+            return read_token(token)
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate and next(self.requests) % rate == 0:
+            return settings.PROFILING_SAMPLE_MODE
+        return None
+
+    def __call__(self, request):
+        mode = self.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+
+        profiler = PROFILERS[mode]()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+        name = (
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-"
+            f"{os.getpid()}-{request.method}-{slug[:80]}{profiler.suffix}"
+        )
+        profiler.save(directory / name)
+        apply_retention(directory)
+        response["X-Profile-Id"] = name
+        return response
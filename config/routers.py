@@ -0,0 +1,101 @@
+"""
+Database routing between the primary and its read replicas.
+
+Reads go to a replica only inside ``replica_reads()``, which the
+planetarium viewsets enter for safe-method requests. Users who have just
+written are pinned to the primary for ``REPLICA_PIN_SECONDS`` so they
+always read their own writes.
+
+The pin is kept twice: in the default cache, which only pins the user
+across processes when it is shared by all of them (``CACHE_BACKEND``),
+and in a signed cookie on the write's response, which follows clients
+that keep cookies to any process whatever the cache.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY_DATABASE = "default"
+PIN_COOKIE = "primary_pin"
+_PIN_SALT = "config.routers"
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+@contextmanager
+def replica_reads(enabled: bool = True):
+    """Route reads made inside the block to a replica when ``enabled``."""
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def _pin_key(user) -> str:
+    return f"primary-pin:{user.pk}"
+
+
+def pin_to_primary(user, response=None) -> None:
+    """
+    Send the user's reads to the primary for ``REPLICA_PIN_SECONDS``,
+    also setting the pin cookie on ``response`` when given.
+    """
+    if not (settings.DATABASE_REPLICAS and user.is_authenticated):
+        return
+    cache.set(_pin_key(user), 1, settings.REPLICA_PIN_SECONDS)
+    if response is not None:
+        response.set_signed_cookie(
+            PIN_COOKIE,
+            user.pk,
+            salt=_PIN_SALT,
+            max_age=settings.REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+
+
+def _pinned_by_cookie(user, request) -> bool:
+    if request is None:
+        return False
+    pinned_user = request.get_signed_cookie(
+        PIN_COOKIE,
+        default=None,
+        salt=_PIN_SALT,
+        max_age=settings.REPLICA_PIN_SECONDS,
+    )
+    return pinned_user == str(user.pk)
+
+
+def is_pinned_to_primary(user, request=None) -> bool:
+    """Return whether the user wrote recently enough to need the primary."""
+    return user.is_authenticated and (
+        cache.get(_pin_key(user)) is not None or _pinned_by_cookie(user, request)
+    )
+
+
+def can_read_from_replica(user, request=None) -> bool:
+    """Return whether the user's reads may be served by a replica."""
+    return bool(settings.DATABASE_REPLICAS) and not is_pinned_to_primary(user, request)
+
+
+class PrimaryReplicaRouter:
+    """Send writes to the primary and opted-in reads to a random replica."""
+
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DATABASE
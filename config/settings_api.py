@@ -0,0 +1,32 @@
+"""
+Settings profile for API-only workers.
+
+Leaves the admin, OpenAPI schema generation and the debug toolbar out of
+INSTALLED_APPS, MIDDLEWARE and the URL configuration, so none of them is
+imported at startup. Select it with
+``DJANGO_SETTINGS_MODULE=config.settings_api``.
+"""
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+EXCLUDED_APPS = (
+    "django.contrib.admin",
+    "drf_spectacular",
+    "debug_toolbar",
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in EXCLUDED_APPS]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware != "debug_toolbar.middleware.DebugToolbarMiddleware"
+]
+
+ROOT_URLCONF = "config.urls_api"
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.openapi.AutoSchema",
+}
@@ -0,0 +1,140 @@
+"""
+Request throttles with a fixed-memory sliding window and per-tier rates.
+
+DRF's throttles keep one timestamp per request in the cache, so their
+memory grows with the rate. These classes keep two counters per client
+and scope instead, one for the current fixed window and one for the
+previous, and estimate the sliding window count as::
+
+    previous * (1 - elapsed fraction of current window) + current
+
+Rates come from ``DEFAULT_THROTTLE_RATES``. A rate named
+``<scope>_<tier>`` takes precedence over ``<scope>`` for users of that
+tier: ``staff`` for staff users and ``partner`` for members of the
+``THROTTLE_PARTNER_GROUP`` group. A rate of ``None`` means no limit.
+
+Views with a ``throttle_scope`` are only limited by their scope, so that
+each scope has a budget of its own; the ``user`` rate covers the others.
+A user's tier is kept in the cache for ``THROTTLE_TIER_CACHE_SECONDS``.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import throttling
+from rest_framework.settings import api_settings
+
+STAFF_TIER = "staff"
+PARTNER_TIER = "partner"
+
+
+def _partner_tier(user):
+    key = f"throttle-tier:{user.pk}"
+    tier = cache.get(key)
+    if tier is None:
+        is_partner = user.groups.filter(name=settings.THROTTLE_PARTNER_GROUP).exists()
+        tier = PARTNER_TIER if is_partner else ""
+        cache.set(key, tier, settings.THROTTLE_TIER_CACHE_SECONDS)
+    return tier or None
+
+
+def get_tier(request):
+    """Return the throttle tier of the request's user, or None."""
+    if not hasattr(request, "_throttle_tier"):
+        user = request.user
+        tier = None
+        if user and user.is_authenticated:
+            tier = STAFF_TIER if user.is_staff else _partner_tier(user)
+        request._throttle_tier = tier
+    return request._throttle_tier
+
+
+class SlidingWindowRateThrottle(throttling.SimpleRateThrottle):
+    """Base class counting requests in a sliding window of two counters."""
+
+    def __init__(self):
+        # The rate depends on the user's tier, so it is resolved per request.
+        pass
+
+    def get_scope(self, view):
+        return self.scope
+
+    def get_rate(self, tier=None):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        if tier and f"{self.scope}_{tier}" in rates:
+            return rates[f"{self.scope}_{tier}"]
+        return super().get_rate()
+
+    @property
+    def THROTTLE_RATES(self):
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(view)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate(get_tier(request))
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, position = divmod(self.now, self.duration)
+        self.elapsed = position / self.duration
+        current_key = f"{self.key}:{int(window)}"
+        previous_key = f"{self.key}:{int(window) - 1}"
+        counts = self.cache.get_many([previous_key, current_key])
+        self.previous = counts.get(previous_key, 0)
+        self.current = counts.get(current_key, 0)
+
+        if self.previous * (1 - self.elapsed) + self.current >= self.num_requests:
+            return self.throttle_failure()
+
+        # Counters outlive their own window by one, while they are the
+        # "previous" window of the next.
+        if not self.cache.add(current_key, 1, self.duration * 2):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                self.cache.set(current_key, 1, self.duration * 2)
+        return True
+
+    def wait(self):
+        """Return the seconds until the estimate drops below the limit."""
+        if self.current >= self.num_requests:
+            # Only the next window can help: by then this window's count
+            # becomes the previous one and decays with the new window.
+            until_next_window = (1 - self.elapsed) * self.duration
+            return until_next_window + self.duration * max(
+                0.0, 1 - self.num_requests / self.current
+            )
+        if self.previous:
+            fraction = 1 - (self.num_requests - self.current) / self.previous
+            return max(0.0, fraction - self.elapsed) * self.duration
+        return None
+
+
+class AnonRateThrottle(SlidingWindowRateThrottle, throttling.AnonRateThrottle):
+    """Limit anonymous requests per IP address."""
+
+
+class UserRateThrottle(SlidingWindowRateThrottle, throttling.UserRateThrottle):
+    """
+    Limit requests per user, or per IP address for anonymous ones, to
+    views without a ``throttle_scope``.
+    """
+
+    def get_scope(self, view):
+        if getattr(view, "throttle_scope", None):
+            return None
+        return self.scope
+
+
+class ScopedRateThrottle(SlidingWindowRateThrottle, throttling.ScopedRateThrottle):
+    """Limit requests per user to views sharing a ``throttle_scope``."""
+
+    def get_scope(self, view):
+        return getattr(view, self.scope_attr, None)
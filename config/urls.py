@@ -18,17 +18,26 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import (
-    SpectacularAPIView,
     SpectacularSwaggerView,
     SpectacularRedocView,
 )
 
+from config.batch import BatchView
+from config.load_shedding import LoadSheddingMetricsView
+from config.views import PrecomputedSpectacularAPIView
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/planetarium/", include("planetarium.urls", namespace="planetarium")),
     path("api/user/", include("user.urls", namespace="user")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/batch/", BatchView.as_view(), name="batch"),
+    path(
+        "api/load-shedding/",
+        LoadSheddingMetricsView.as_view(),
+        name="load-shedding-metrics",
+    ),
+    path("api/schema/", PrecomputedSpectacularAPIView.as_view(), name="schema"),
     path(
         "api/doc/swagger/",
         SpectacularSwaggerView.as_view(url_name="schema"),
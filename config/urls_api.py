@@ -0,0 +1,20 @@
+"""
+URL configuration for API-only workers, see ``config.settings_api``.
+"""
+
+from django.urls import path, include
+
+from config.batch import BatchView
+from config.load_shedding import LoadSheddingMetricsView
+
+
+urlpatterns = [
+    path("api/planetarium/", include("planetarium.urls", namespace="planetarium")),
+    path("api/user/", include("user.urls", namespace="user")),
+    path("api/batch/", BatchView.as_view(), name="batch"),
+    path(
+        "api/load-shedding/",
+        LoadSheddingMetricsView.as_view(),
+        name="load-shedding-metrics",
+    ),
+]
@@ -0,0 +1,56 @@
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+
+def schema_file_path(schema_format: str) -> Path:
+    """Return where ``generate_schema`` writes the schema in ``schema_format``."""
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f"schema.{schema_format}"
+
+
+@lru_cache(maxsize=4)
+def _load_schema_file(path: Path, modified: int) -> tuple:
+    """Read a schema file once per modification and compute its ETag."""
+    content = path.read_bytes()
+    return content, f'"{hashlib.sha256(content).hexdigest()}"'
+
+
+class PrecomputedSpectacularAPIView(SpectacularAPIView):
+    """
+    Serve the schema written at build time by ``generate_schema``.
+
+    In DEBUG the schema is generated per request, so that it follows code
+    changes. Otherwise it is never generated live: a missing file is a
+    broken build and answers 404.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG:
+            return super().get(request, *args, **kwargs)
+        renderer = request.accepted_renderer
+        path = schema_file_path(renderer.format)
+        try:
+            modified = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise Http404(f"{path} is missing, run generate_schema.")
+        content, etag = _load_schema_file(path, modified)
+
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        else:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            response = HttpResponse(content, content_type=content_type)
+
+        response["ETag"] = etag
+        response["Cache-Control"] = (
+            f"public, max-age={settings.OPENAPI_SCHEMA_CACHE_SECONDS}"
+        )
+        return response
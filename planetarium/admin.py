@@ -1,4 +1,12 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+
+from .cancellation import cancel_astronomy_show, cancel_show_session
 
 from .models import (
     AstronomyShow,
@@ -7,21 +15,187 @@ from .models import (
     ShowSession,
     Reservation,
     Ticket,
+    WaitlistEntry,
+    ArchivedTicket,
 )
 
 
-class TicketInline(admin.TabularInline):
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting unfiltered PostgreSQL tables from the planner's
+    row estimate instead of a full ``COUNT(*)``.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class "
+                        "WHERE oid = %s::regclass",
+                        [queryset.model._meta.db_table],
+                    )
+                    estimate = cursor.fetchone()[0]
+                # Small or never analyzed tables are cheap to count exactly.
+                if estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                    return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Admin for tables too large to count or list without care."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline formset editing one page of the related objects at a time."""
+
+    per_page = 20
+    page_param = "page"
+    query_params = None
+
+    def get_queryset(self):
+        if not hasattr(self, "page"):
+            queryset = super().get_queryset()
+            self.page = Paginator(queryset, self.per_page).get_page(
+                self.query_params and self.query_params.get(self.page_param)
+            )
+            self._queryset = self.page.object_list
+        return self._queryset
+
+    def _page_url(self, number):
+        query_params = self.query_params.copy()
+        query_params[self.page_param] = number
+        return f"?{query_params.urlencode()}"
+
+    @property
+    def previous_page_url(self):
+        return self._page_url(self.page.previous_page_number())
+
+    @property
+    def next_page_url(self):
+        return self._page_url(self.page.next_page_number())
+
+
+class PaginatedTabularInline(admin.TabularInline):
+    """Tabular inline showing ``per_page`` related objects per page."""
+
+    formset = PaginatedInlineFormSet
+    template = "admin/planetarium/paginated_tabular.html"
+    per_page = 20
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_param = f"{self.model._meta.model_name}_page"
+        formset.query_params = request.GET
+        return formset
+
+
+class TicketInline(PaginatedTabularInline):
     model = Ticket
     extra = 1
+    raw_id_fields = ("show_session",)
+
+
+class ArchivedTicketInline(PaginatedTabularInline):
+    model = ArchivedTicket
+    extra = 0
+    can_delete = False
+    raw_id_fields = ("show_session",)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Reservation)
-class ReservationAdmin(admin.ModelAdmin):
-    inlines = [TicketInline]
+class ReservationAdmin(LargeTableAdmin):
+    inlines = [TicketInline, ArchivedTicketInline]
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    search_fields = ("user__email",)
+
+
+def cancellation_actions(cancel):
+    """Return admin actions cancelling the selected objects with ``cancel``."""
+
+    @admin.action(description="Cancel and delete their tickets")
+    def cancel_and_delete(modeladmin, request, queryset):
+        for pk in queryset.values_list("pk", flat=True):
+            cancel(pk)
+        modeladmin.message_user(request, "Cancelled; tickets are being removed.")
+
+    @admin.action(description="Cancel and archive their tickets")
+    def cancel_and_archive(modeladmin, request, queryset):
+        for pk in queryset.values_list("pk", flat=True):
+            cancel(pk, archive=True)
+        modeladmin.message_user(request, "Cancelled; tickets are being archived.")
+
+    return [cancel_and_delete, cancel_and_archive]
+
+
+@admin.register(AstronomyShow)
+class AstronomyShowAdmin(admin.ModelAdmin):
+    list_display = ("title",)
+    search_fields = ("title",)
+    autocomplete_fields = ("show_theme",)
+    actions = cancellation_actions(cancel_astronomy_show)
+
+
+@admin.register(ShowTheme)
+class ShowThemeAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(PlanetariumDome)
+class PlanetariumDomeAdmin(admin.ModelAdmin):
+    list_display = ("name", "rows", "seats_in_row")
+    search_fields = ("name",)
+
+
+@admin.register(ShowSession)
+class ShowSessionAdmin(LargeTableAdmin):
+    list_display = (
+        "id",
+        "astronomy_show",
+        "planetarium_dome",
+        "show_time",
+        "admission_rate",
+        "cancelled_at",
+    )
+    list_select_related = ("astronomy_show", "planetarium_dome")
+    actions = cancellation_actions(cancel_show_session)
+    autocomplete_fields = ("astronomy_show", "planetarium_dome")
+    search_fields = ("astronomy_show__title",)
+
+
+@admin.register(Ticket)
+class TicketAdmin(LargeTableAdmin):
+    list_display = ("id", "show_session", "row", "seat", "reservation")
+    list_select_related = ("show_session__planetarium_dome", "reservation")
+    raw_id_fields = ("show_session", "reservation")
+
+
+@admin.register(ArchivedTicket)
+class ArchivedTicketAdmin(LargeTableAdmin):
+    list_display = ("id", "show_session", "row", "seat", "reservation")
+    list_select_related = ("show_session__planetarium_dome", "reservation")
+    raw_id_fields = ("show_session", "reservation")
 
 
-admin.site.register(AstronomyShow)
-admin.site.register(ShowTheme)
-admin.site.register(PlanetariumDome)
-admin.site.register(ShowSession)
-admin.site.register(Ticket)
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(LargeTableAdmin):
+    list_display = ("id", "show_session", "user", "seats", "status", "created_at")
+    list_select_related = ("show_session__planetarium_dome", "user")
+    list_filter = ("status",)
+    raw_id_fields = ("show_session", "user")
@@ -0,0 +1,57 @@
+"""
+Archiving of tickets for sessions that have already taken place.
+
+Tickets of sessions older than ``TICKET_ARCHIVE_AFTER_DAYS`` are moved
+from ``Ticket`` to ``ArchivedTicket`` in batches, keeping their ids, so
+the table the booking path checks and locks stays proportional to the
+upcoming sessions. Reservation history, the seats of a session and
+the checks that keep them from being booked twice read both tables.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from planetarium.models import ArchivedTicket, Ticket
+
+
+def archive_cutoff(days=None, now=None):
+    """Return the show time before which tickets are archived."""
+    if days is None:
+        days = settings.TICKET_ARCHIVE_AFTER_DAYS
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def archive_tickets(tickets, batch_size=None) -> int:
+    """
+    Move up to ``batch_size`` tickets of the ``tickets`` queryset to the
+    archive, returning how many were moved.
+    """
+    batch_size = batch_size or settings.TICKET_ARCHIVE_BATCH_SIZE
+    with transaction.atomic():
+        rows = list(
+            tickets.select_for_update(skip_locked=True, of=("self",))
+            .order_by("id")
+            .values("id", "row", "seat", "show_session_id", "reservation_id")[
+                :batch_size
+            ]
+        )
+        if not rows:
+            return 0
+        ArchivedTicket.objects.bulk_create(
+            [ArchivedTicket(**row) for row in rows], ignore_conflicts=True
+        )
+        Ticket.objects.filter(id__in=[row["id"] for row in rows]).delete()
+    return len(rows)
+
+
+def archive_batch(cutoff, batch_size=None) -> int:
+    """
+    Move up to ``batch_size`` tickets of sessions before ``cutoff`` to the
+    archive, returning how many were moved.
+    """
+    return archive_tickets(
+        Ticket.objects.filter(show_session__show_time__lt=cutoff), batch_size
+    )
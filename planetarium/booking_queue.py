@@ -0,0 +1,239 @@
+"""
+Group-commit booking queue with a single writer per show session.
+
+With ``BOOKING_QUEUE_MODE = "thread"``, reservations for a single
+session are not written by the request that made them. They are queued
+to a writer thread owning that session, which takes everything queued
+so far (up to ``BOOKING_QUEUE_BATCH_SIZE`` requests), locks the session
+row, resolves seat conflicts against the taken seats in memory and
+commits every accepted reservation in one transaction. Each waiting
+request is then answered with its reservation or its conflict. Under
+contention this turns many transactions racing on the ticket index into
+a few larger ones, with no rolled back work.
+
+``"inline"`` runs the same batch code in the requesting thread, so tests
+exercise it on their own database connection; ``"off"`` keeps the
+regular path. Writers are per process: several processes serialize
+their batches on the session row lock.
+
+A request still waiting after ``BOOKING_QUEUE_TIMEOUT_SECONDS`` is
+withdrawn from the queue and answered with 503, so it is never booked
+behind the back of a client that retried. Callers inside a transaction,
+such as requests storing their ``Idempotency-Key``, book inline: the
+writer's separate transaction could commit a booking whose key is then
+rolled back, letting a retry book again.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from planetarium.jobs import enqueue
+from planetarium.models import Reservation, ShowSession, Ticket
+from planetarium.seat_events import SEAT_TAKEN, publish_seats
+from planetarium.waitlist import claim_offers
+
+logger = logging.getLogger(__name__)
+
+SEAT_TAKEN_ERROR = "Some of these seats have already been taken."
+
+
+class BookingQueueBusy(APIException):
+    """Raised when a booking was withdrawn after waiting too long."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Bookings for this session are backed up, please retry."
+    default_code = "booking_queue_busy"
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+
+class BookingRequest:
+    """One reservation waiting for its session's writer."""
+
+    def __init__(self, user, tickets):
+        self.user = user
+        self.tickets = tickets
+        self.seats = {(ticket["row"], ticket["seat"]) for ticket in tickets}
+        self.future = Future()
+
+
+def commit_batch(show_session_id, requests) -> None:
+    """
+    Book every request of the batch whose seats are still free, in one
+    transaction, and answer each request's future.
+    """
+    accepted = []
+    with transaction.atomic():
+        ShowSession.objects.select_for_update().filter(id=show_session_id).exists()
+        taken = set(
+            Ticket.objects.filter(show_session_id=show_session_id).values_list(
+                "row", "seat"
+            )
+        )
+        rejected = []
+        for request in requests:
+            if len(request.seats) < len(request.tickets) or request.seats & taken:
+                rejected.append(request)
+                continue
+            taken |= request.seats
+            accepted.append(request)
+
+        reservations = Reservation.objects.bulk_create(
+            [Reservation(user=request.user) for request in accepted]
+        )
+        Ticket.objects.bulk_create(
+            [
+                Ticket(reservation=reservation, **ticket)
+                for reservation, request in zip(reservations, accepted)
+                for ticket in request.tickets
+            ]
+        )
+        publish_seats(
+            show_session_id,
+            SEAT_TAKEN,
+            [
+                {"row": row, "seat": seat}
+                for request in accepted
+                for row, seat in sorted(request.seats)
+            ],
+        )
+        for request in accepted:
+            claim_offers(request.user, [show_session_id])
+        for reservation in reservations:
+            enqueue("reservation_created", reservation_id=reservation.id)
+
+    for reservation, request in zip(reservations, accepted):
+        request.future.set_result(reservation)
+    for request in rejected:
+        request.future.set_exception(ValidationError({"tickets": SEAT_TAKEN_ERROR}))
+
+
+def process_batch(show_session_id, requests) -> None:
+    """
+    Commit ``requests`` as one batch, falling back to one transaction per
+    request if the batch fails, e.g. on seats booked outside the queue.
+    """
+    try:
+        commit_batch(show_session_id, requests)
+        return
+    except IntegrityError:
+        if len(requests) == 1:
+            requests[0].future.set_exception(
+                ValidationError({"tickets": SEAT_TAKEN_ERROR})
+            )
+            return
+    except Exception as error:
+        logger.exception("Booking batch for show session %s failed", show_session_id)
+        for request in requests:
+            request.future.set_exception(error)
+        return
+    for request in requests:
+        process_batch(show_session_id, [request])
+
+
+class SessionWriter(threading.Thread):
+    """Thread committing the queued bookings of one show session."""
+
+    def __init__(self, booking_queue, show_session_id):
+        super().__init__(name=f"booking-writer-{show_session_id}", daemon=True)
+        self.booking_queue = booking_queue
+        self.show_session_id = show_session_id
+        self.requests = queue.Queue()
+
+    def take_batch(self):
+        """Wait for a request, then take whatever else is already queued."""
+        batch = [self.requests.get(timeout=settings.BOOKING_QUEUE_IDLE_SECONDS)]
+        while len(batch) < settings.BOOKING_QUEUE_BATCH_SIZE:
+            try:
+                batch.append(self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        try:
+            while True:
+                try:
+                    batch = self.take_batch()
+                except queue.Empty:
+                    if self.booking_queue.retire(self):
+                        return
+                    continue
+                # Requests withdrawn by a caller that stopped waiting.
+                batch = [
+                    request
+                    for request in batch
+                    if request.future.set_running_or_notify_cancel()
+                ]
+                if not batch:
+                    continue
+                close_old_connections()
+                process_batch(self.show_session_id, batch)
+        finally:
+            connections.close_all()
+
+
+class BookingQueue:
+    """Route bookings to one writer per show session."""
+
+    def __init__(self):
+        self._writers = {}
+        self._lock = threading.Lock()
+
+    def submit(self, show_session_id, request) -> Future:
+        """Queue ``request`` for the session's writer, starting it if needed."""
+        with self._lock:
+            writer = self._writers.get(show_session_id)
+            if writer is None:
+                writer = self._writers[show_session_id] = SessionWriter(
+                    self, show_session_id
+                )
+                writer.start()
+            writer.requests.put(request)
+        return request.future
+
+    def retire(self, writer) -> bool:
+        """Stop tracking an idle writer, unless a request arrived meanwhile."""
+        with self._lock:
+            if not writer.requests.empty():
+                return False
+            del self._writers[writer.show_session_id]
+            return True
+
+
+_booking_queue = BookingQueue()
+
+
+def book(user, tickets):
+    """
+    Book ``tickets``, all in one show session, through the queue and
+    return the reservation, or raise ``ValidationError`` on a conflict
+    and ``BookingQueueBusy`` if the writer did not get to it in time.
+    """
+    show_session_id = tickets[0]["show_session"].id
+    request = BookingRequest(user, tickets)
+    if (
+        settings.BOOKING_QUEUE_MODE == "inline"
+        or transaction.get_connection().in_atomic_block
+    ):
+        process_batch(show_session_id, [request])
+        return request.future.result()
+
+    _booking_queue.submit(show_session_id, request)
+    try:
+        return request.future.result(timeout=settings.BOOKING_QUEUE_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        if request.future.cancel():
+            raise BookingQueueBusy(settings.BOOKING_QUEUE_RETRY_AFTER)
+        # The writer is already committing it; its outcome is the answer.
+        return request.future.result()
@@ -0,0 +1,268 @@
+"""
+Bulk import of show themes, astronomy shows and show sessions.
+
+Rows come from a JSON list or a CSV file and refer to other objects by
+name: shows list their themes by name (``;``-separated in CSV), and
+sessions name their show by title and their dome by name. Every row is
+validated, and every name resolved with one query per kind, before
+anything is written; an import with any bad row writes nothing and
+reports the errors of all rows. Valid imports are inserted with
+``bulk_create`` in batches of ``IMPORT_BATCH_SIZE`` in one transaction.
+
+Themes and shows are matched on their name and title, so importing them
+again skips existing themes and updates existing shows.
+"""
+
+import csv
+import io
+import json
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.db import transaction
+
+from planetarium.models import AstronomyShow, PlanetariumDome, ShowSession, ShowTheme
+from planetarium.serializers import (
+    AstronomyShowImportSerializer,
+    ShowSessionImportSerializer,
+    ShowThemeImportSerializer,
+)
+
+
+class CatalogImportError(Exception):
+    """Raised with the per-row errors of an import that was not written."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} row(s) failed validation")
+        self.errors = errors
+
+
+def read_rows(file, file_format) -> list:
+    """Return the rows of a binary ``file`` in ``"csv"`` or ``"json"`` format."""
+    if file_format == "csv":
+        return list(csv.DictReader(io.StringIO(file.read().decode("utf-8-sig"))))
+    if file_format == "json":
+        rows = json.load(file)
+        if not isinstance(rows, list):
+            raise CatalogImportError([{"row": None, "errors": "Expected a list."}])
+        return rows
+    raise ValueError(f"Unsupported import format {file_format!r}")
+
+
+class Importer(ABC):
+    """Validate and insert rows of one kind."""
+
+    serializer_class = None
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+
+    def prepare_row(self, row):
+        """Adapt a row read from a file before validation."""
+        return row
+
+    @abstractmethod
+    def resolve(self, rows):
+        """
+        Return ``(objects, errors)`` for the validated ``(row number,
+        data)`` pairs, looking referenced objects up by name.
+        """
+
+    @abstractmethod
+    def save(self, objects) -> dict:
+        """
+        Write ``objects``, returning the number of rows ``created`` and,
+        for kinds matched on a natural key, ``updated``.
+        """
+
+    def run(self, rows) -> dict:
+        """Validate every row, then insert them all or raise."""
+        if not isinstance(rows, list):
+            raise CatalogImportError([{"row": None, "errors": "Expected a list."}])
+        errors = []
+        valid = []
+        for number, row in enumerate(rows, start=1):
+            serializer = self.serializer_class(
+                data=self.prepare_row(row) if isinstance(row, dict) else row
+            )
+            if serializer.is_valid():
+                valid.append((number, serializer.validated_data))
+            else:
+                errors.append({"row": number, "errors": serializer.errors})
+        objects, reference_errors = self.resolve(valid)
+        errors = sorted(errors + reference_errors, key=lambda error: error["row"])
+        if errors:
+            raise CatalogImportError(errors)
+        with transaction.atomic():
+            counts = self.save(objects)
+        return {"rows": len(rows), **counts}
+
+
+def _unique_by_name(queryset, field, names):
+    """Return ``{name: pk}``, leaving out names matching several rows."""
+    found = {}
+    for pk, name in queryset.filter(**{f"{field}__in": names}).values_list("pk", field):
+        found[name] = None if name in found else pk
+    return found
+
+
+def _lookup_error(found, name):
+    if name in found:
+        return [f"{name!r} matches more than one object."]
+    return [f"{name!r} does not exist."]
+
+
+class ShowThemeImporter(Importer):
+    """Import show themes, skipping names that already exist."""
+
+    serializer_class = ShowThemeImportSerializer
+
+    def resolve(self, rows):
+        names = dict.fromkeys(data["name"] for _, data in rows)
+        existing = set(
+            ShowTheme.objects.filter(name__in=names).values_list("name", flat=True)
+        )
+        return [ShowTheme(name=name) for name in names if name not in existing], []
+
+    def save(self, objects):
+        ShowTheme.objects.bulk_create(objects, batch_size=self.batch_size)
+        return {"created": len(objects)}
+
+
+class AstronomyShowImporter(Importer):
+    """
+    Import astronomy shows with their themes, updating the shows whose
+    title already exists. A field missing from a row is left unchanged.
+    """
+
+    serializer_class = AstronomyShowImportSerializer
+
+    def prepare_row(self, row):
+        if isinstance(row.get("show_theme"), str):
+            themes = [name.strip() for name in row["show_theme"].split(";")]
+            row = {**row, "show_theme": [name for name in themes if name]}
+        return row
+
+    def resolve(self, rows):
+        themes = _unique_by_name(
+            ShowTheme.objects.all(),
+            "name",
+            {name for _, data in rows for name in data.get("show_theme", ())},
+        )
+        shows = _unique_by_name(
+            AstronomyShow.objects.all(), "title", {data["title"] for _, data in rows}
+        )
+        # A title listed twice is imported from its last row.
+        objects = {}
+        errors = []
+        for number, data in rows:
+            row_errors = {}
+            if data["title"] in shows and shows[data["title"]] is None:
+                row_errors["title"] = _lookup_error(shows, data["title"])
+            theme_ids = []
+            for name in data.get("show_theme", ()):
+                if themes.get(name) is None:
+                    row_errors["show_theme"] = _lookup_error(themes, name)
+                    break
+                theme_ids.append(themes[name])
+            if row_errors:
+                errors.append({"row": number, "errors": row_errors})
+                continue
+            show = AstronomyShow(
+                id=shows.get(data["title"]),
+                title=data["title"],
+                description=data.get("description"),
+            )
+            objects[data["title"]] = (
+                show,
+                "description" in data,
+                theme_ids if "show_theme" in data else None,
+            )
+        return list(objects.values()), errors
+
+    def save(self, objects):
+        new = [show for show, _, _ in objects if show.id is None]
+        existing_ids = {show.id for show, _, _ in objects if show.id is not None}
+        AstronomyShow.objects.bulk_create(new, batch_size=self.batch_size)
+        AstronomyShow.objects.bulk_update(
+            [
+                show
+                for show, has_description, _ in objects
+                if show.id in existing_ids and has_description
+            ],
+            ["description"],
+            batch_size=self.batch_size,
+        )
+        themed = [
+            (show, theme_ids) for show, _, theme_ids in objects if theme_ids is not None
+        ]
+        through = AstronomyShow.show_theme.through
+        through.objects.filter(
+            astronomyshow_id__in=[
+                show.id for show, _ in themed if show.id in existing_ids
+            ]
+        ).delete()
+        through.objects.bulk_create(
+            [
+                through(astronomyshow_id=show.id, showtheme_id=theme_id)
+                for show, theme_ids in themed
+                for theme_id in dict.fromkeys(theme_ids)
+            ],
+            batch_size=self.batch_size,
+        )
+        return {"created": len(new), "updated": len(existing_ids)}
+
+
+class ShowSessionImporter(Importer):
+    """Import show sessions of existing shows and domes."""
+
+    serializer_class = ShowSessionImportSerializer
+
+    def resolve(self, rows):
+        shows = _unique_by_name(
+            AstronomyShow.objects.all(),
+            "title",
+            {data["astronomy_show"] for _, data in rows},
+        )
+        domes = _unique_by_name(
+            PlanetariumDome.objects.all(),
+            "name",
+            {data["planetarium_dome"] for _, data in rows},
+        )
+        objects = []
+        errors = []
+        for number, data in rows:
+            row_errors = {}
+            for field, found in (
+                ("astronomy_show", shows),
+                ("planetarium_dome", domes),
+            ):
+                if found.get(data[field]) is None:
+                    row_errors[field] = _lookup_error(found, data[field])
+            if row_errors:
+                errors.append({"row": number, "errors": row_errors})
+                continue
+            objects.append(
+                ShowSession(
+                    astronomy_show_id=shows[data["astronomy_show"]],
+                    planetarium_dome_id=domes[data["planetarium_dome"]],
+                    show_time=data["show_time"],
+                )
+            )
+        return objects, errors
+
+    def save(self, objects):
+        ShowSession.objects.bulk_create(objects, batch_size=self.batch_size)
+        return {"created": len(objects)}
+
+
+IMPORTERS = {
+    "show_themes": ShowThemeImporter,
+    "astronomy_shows": AstronomyShowImporter,
+    "show_sessions": ShowSessionImporter,
+}
+
+
+def import_catalog(kind, rows, batch_size=None) -> dict:
+    """Import ``rows`` of ``kind``, one of ``IMPORTERS``."""
+    return IMPORTERS[kind](batch_size).run(rows)
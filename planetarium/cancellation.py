@@ -0,0 +1,153 @@
+"""
+Cancellation of show sessions and astronomy shows.
+
+Cancelling sets ``cancelled_at`` on the sessions at once, so they leave
+the listings and take no more bookings, and queues a job that removes
+their dependents afterwards. Tickets are deleted, or moved to the ticket
+archive, ``CANCELLATION_CHUNK_SIZE`` at a time with one set-based
+statement per chunk, instead of being loaded by Django's deletion
+collector all in one transaction. Purge jobs run outside of the job
+worker's claiming transaction and commit every chunk on its own, so
+transactions stay short. A job does at most
+``CANCELLATION_CHUNKS_PER_JOB`` chunks and then queues its continuation,
+and a stopped worker's job resumes where it left off.
+"""
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from planetarium.archive import archive_tickets
+from planetarium.jobs import enqueue
+from planetarium.models import (
+    ArchivedTicket,
+    AstronomyShow,
+    Reservation,
+    ShowSession,
+    Ticket,
+    WaitlistEntry,
+)
+from planetarium.seat_events import SESSION_CANCELLED, publish_seats
+
+PURGE_SHOW_SESSION = "purge_show_session"
+PURGE_ASTRONOMY_SHOW = "purge_astronomy_show"
+
+_FINISHED = object()
+
+
+def _mark_cancelled(show_sessions):
+    show_session_ids = list(
+        show_sessions.filter(cancelled_at__isnull=True).values_list("id", flat=True)
+    )
+    ShowSession.objects.filter(id__in=show_session_ids).update(
+        cancelled_at=timezone.now()
+    )
+    for show_session_id in show_session_ids:
+        publish_seats(show_session_id, SESSION_CANCELLED, [])
+
+
+def cancel_show_session(show_session_id, archive=False) -> None:
+    """
+    Cancel a session and queue the removal of its tickets, which are
+    moved to the archive instead when ``archive`` is set.
+    """
+    with transaction.atomic():
+        _mark_cancelled(ShowSession.objects.filter(id=show_session_id))
+        enqueue(PURGE_SHOW_SESSION, show_session_id=show_session_id, archive=archive)
+
+
+def cancel_astronomy_show(astronomy_show_id, archive=False) -> None:
+    """Cancel every session of a show and queue their removal."""
+    with transaction.atomic():
+        _mark_cancelled(ShowSession.objects.filter(astronomy_show_id=astronomy_show_id))
+        enqueue(
+            PURGE_ASTRONOMY_SHOW, astronomy_show_id=astronomy_show_id, archive=archive
+        )
+
+
+def _delete_chunk(model, show_session_id) -> int:
+    """Delete one chunk of the session's ``model`` tickets and emptied reservations."""
+    connection = connections[router.db_for_write(model)]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id IN ("
+            f"SELECT id FROM {table} WHERE show_session_id = %s "
+            f"ORDER BY id LIMIT %s) RETURNING reservation_id",
+            [show_session_id, settings.CANCELLATION_CHUNK_SIZE],
+        )
+        reservation_ids = [reservation_id for reservation_id, in cursor.fetchall()]
+    if reservation_ids:
+        Reservation.objects.filter(
+            id__in=set(reservation_ids),
+            tickets__isnull=True,
+            archived_tickets__isnull=True,
+        ).delete()
+    return len(reservation_ids)
+
+
+def _session_steps(show_session_id, archive):
+    """Remove a cancelled session's dependents, yielding after each chunk."""
+    tickets = Ticket.objects.filter(show_session_id=show_session_id)
+    if archive:
+        while archive_tickets(tickets, settings.CANCELLATION_CHUNK_SIZE):
+            yield
+        WaitlistEntry.objects.filter(
+            show_session_id=show_session_id,
+            status__in=WaitlistEntry.ACTIVE_STATUSES,
+        ).update(status=WaitlistEntry.EXPIRED)
+        return
+    for model in (Ticket, ArchivedTicket):
+        while _delete_chunk(model, show_session_id):
+            yield
+    WaitlistEntry.objects.filter(show_session_id=show_session_id).delete()
+    ShowSession.objects.filter(id=show_session_id).delete()
+
+
+def _show_steps(astronomy_show_id, archive):
+    show_session_ids = (
+        ShowSession.objects.filter(
+            astronomy_show_id=astronomy_show_id, cancelled_at__isnull=False
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    for show_session_id in show_session_ids:
+        yield from _session_steps(show_session_id, archive)
+    if not archive:
+        AstronomyShow.objects.filter(id=astronomy_show_id).delete()
+
+
+def _run_steps(steps, job_name, **payload) -> bool:
+    """
+    Run up to ``CANCELLATION_CHUNKS_PER_JOB`` chunks, each in its own
+    transaction, queueing the job again if work remains. Returns whether
+    the work is finished.
+    """
+    for _ in range(settings.CANCELLATION_CHUNKS_PER_JOB):
+        with transaction.atomic():
+            finished = next(steps, _FINISHED) is _FINISHED
+        if finished:
+            return True
+    enqueue(job_name, **payload)
+    return False
+
+
+def purge_show_session(show_session_id, archive=False) -> bool:
+    """Remove the next chunks of a cancelled session's dependents."""
+    return _run_steps(
+        _session_steps(show_session_id, archive),
+        PURGE_SHOW_SESSION,
+        show_session_id=show_session_id,
+        archive=archive,
+    )
+
+
+def purge_astronomy_show(astronomy_show_id, archive=False) -> bool:
+    """Remove the next chunks of a cancelled show's sessions."""
+    return _run_steps(
+        _show_steps(astronomy_show_id, archive),
+        PURGE_ASTRONOMY_SHOW,
+        astronomy_show_id=astronomy_show_id,
+        archive=archive,
+    )
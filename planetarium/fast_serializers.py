@@ -0,0 +1,233 @@
+"""
+Read-only list serializers that render rows straight from ``QuerySet.values()``.
+
+Each class mirrors one of the ``ModelSerializer`` classes in
+``planetarium.serializers`` and produces identical output, but never
+instantiates model objects or walks the DRF field machinery per row.
+"""
+
+import copy
+import operator
+from collections import defaultdict
+from itertools import chain
+
+from rest_framework import serializers
+
+from planetarium.models import ArchivedTicket, AstronomyShow, Ticket
+from planetarium.reference_cache import theme_cache
+from planetarium.serializers import (
+    AstronomyShowListSerializer,
+    ShowSessionListSerializer,
+    ReservationListSerializer,
+    TicketListSerializer,
+)
+
+
+def _bind_to_representation(field):
+    """
+    Return ``field.to_representation``, with the timezone of datetime
+    fields pinned to the one active now.
+    """
+    if isinstance(field, serializers.DateTimeField) and not hasattr(field, "timezone"):
+        field = copy.copy(field)
+        field.timezone = field.default_timezone()
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Base class for serializers fed by ``QuerySet.values()``.
+
+    ``sources`` maps every output field to one of:
+
+    * a ``values()`` lookup, e.g. ``"planetarium_dome__name"``;
+    * a tuple ``(function, lookup, ...)`` computed from several lookups;
+    * another ``ValuesSerializer`` subclass for a forward foreign key,
+      flattened into the same query under the field name as prefix.
+
+    Fields listed in ``related`` are filled in by ``get_related`` with
+    one extra query per relation for the whole page.
+    """
+
+    serializer_class = None
+    sources = {}
+    related = ()
+
+    _columns = None
+
+    @classmethod
+    def get_columns(cls):
+        """
+        Return ``(field name, field, source)`` triples in the output order
+        of ``serializer_class``.
+        """
+        if cls.__dict__.get("_columns") is None:
+            cls._columns = [
+                (name, field, cls.sources.get(name))
+                for name, field in cls.serializer_class().fields.items()
+                if name in cls.sources or name in cls.related
+            ]
+        return cls._columns
+
+    @classmethod
+    def get_lookups(cls, prefix=""):
+        """Return every ``values()`` lookup needed to render a row."""
+        lookups = []
+        for name, field, source in cls.get_columns():
+            if source is None:
+                continue
+            if isinstance(source, type):
+                lookups.extend(source.get_lookups(f"{prefix}{name}__"))
+            elif isinstance(source, tuple):
+                lookups.extend(prefix + lookup for lookup in source[1:])
+            else:
+                lookups.append(prefix + source)
+        return lookups
+
+    @classmethod
+    def compile(cls, prefix=""):
+        """
+        Return a function building one output row from a ``values()``
+        dictionary.
+
+        Compiled once per page, so request state such as the active
+        timezone is resolved once instead of once per row.
+        """
+        steps = []
+        for name, field, source in cls.get_columns():
+            if source is None:
+                steps.append((name, None, None))
+            elif isinstance(source, type):
+                steps.append((name, source.compile(f"{prefix}{name}__"), None))
+            elif isinstance(source, tuple):
+                lookups = tuple(prefix + lookup for lookup in source[1:])
+                steps.append((name, source[0], lookups))
+            else:
+                steps.append((name, _bind_to_representation(field), prefix + source))
+
+        def render_row(values):
+            row = {}
+            for name, function, lookups in steps:
+                if function is None:
+                    row[name] = None
+                elif lookups is None:
+                    row[name] = function(values)
+                elif isinstance(lookups, str):
+                    value = values[lookups]
+                    row[name] = None if value is None else function(value)
+                else:
+                    args = [values[lookup] for lookup in lookups]
+                    row[name] = None if None in args else function(*args)
+            return row
+
+        return render_row
+
+    def values(self, queryset):
+        """Narrow ``queryset`` to the columns this serializer reads."""
+        return queryset.values(*dict.fromkeys(["id", *self.get_lookups()]))
+
+    def get_related(self, ids):
+        """
+        Return ``{field name: {parent id: value}}`` for fields in ``related``.
+        """
+        return {}
+
+    def render(self, rows):
+        """Render a page of ``values()`` rows."""
+        render_row = self.compile()
+        data = [render_row(values) for values in rows]
+        if self.related:
+            ids = [values["id"] for values in rows]
+            for name, by_id in self.get_related(ids).items():
+                for row, values in zip(data, rows):
+                    row[name] = by_id.get(values["id"], [])
+        return data
+
+
+class ShowSessionListValuesSerializer(ValuesSerializer):
+    serializer_class = ShowSessionListSerializer
+    sources = {
+        "id": "id",
+        "show_time": "show_time",
+        "astronomy_show": "astronomy_show__title",
+        "planetarium_dome": "planetarium_dome__name",
+        "planetarium_dome_capacity": (
+            operator.mul,
+            "planetarium_dome__rows",
+            "planetarium_dome__seats_in_row",
+        ),
+        "tickets_available": "tickets_available",
+    }
+
+
+class TicketShowSessionValuesSerializer(ShowSessionListValuesSerializer):
+    # Sessions reached through a ticket carry no ``tickets_available``
+    # annotation, so the model serializer skips that field as well.
+    sources = {
+        name: source
+        for name, source in ShowSessionListValuesSerializer.sources.items()
+        if name != "tickets_available"
+    }
+
+
+class AstronomyShowListValuesSerializer(ValuesSerializer):
+    serializer_class = AstronomyShowListSerializer
+    sources = {
+        "id": "id",
+        "title": "title",
+        "description": "description",
+    }
+    related = ("show_theme",)
+
+    def get_related(self, ids):
+        links = list(
+            AstronomyShow.show_theme.through.objects.filter(astronomyshow_id__in=ids)
+            .order_by("id")
+            .values_list("astronomyshow_id", "showtheme_id")
+        )
+        themes = theme_cache.get_many({show_theme_id for _, show_theme_id in links})
+        show_themes = defaultdict(list)
+        for astronomy_show_id, show_theme_id in links:
+            # A theme deleted since the links were read is left out.
+            if show_theme_id in themes:
+                show_themes[astronomy_show_id].append(themes[show_theme_id].name)
+        return {"show_theme": show_themes}
+
+
+class TicketListValuesSerializer(ValuesSerializer):
+    serializer_class = TicketListSerializer
+    sources = {
+        "id": "id",
+        "row": "row",
+        "seat": "seat",
+        "show_session": TicketShowSessionValuesSerializer,
+    }
+
+
+class ReservationListValuesSerializer(ValuesSerializer):
+    serializer_class = ReservationListSerializer
+    sources = {
+        "id": "id",
+        "created_at": "created_at",
+    }
+    related = ("tickets",)
+
+    def get_related(self, ids):
+        render_ticket = TicketListValuesSerializer.compile()
+        lookups = (*TicketListValuesSerializer.get_lookups(), "reservation_id")
+        by_reservation = defaultdict(list)
+        for values in chain(
+            Ticket.objects.filter(reservation_id__in=ids).values(*lookups),
+            ArchivedTicket.objects.filter(reservation_id__in=ids).values(*lookups),
+        ):
+            by_reservation[values["reservation_id"]].append(values)
+        tickets = {
+            reservation_id: [
+                render_ticket(values)
+                for values in sorted(
+                    rows, key=lambda values: (values["row"], values["seat"])
+                )
+            ]
+            for reservation_id, rows in by_reservation.items()
+        }
+        return {"tickets": tickets}
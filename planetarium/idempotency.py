@@ -0,0 +1,56 @@
+"""
+Replay of responses to requests retried with the same ``Idempotency-Key``.
+
+The first request stores its response in the ``IdempotencyKey`` table,
+in the same transaction as the work it did, and in the cache. Retries
+are answered from the cache, or the table after a cache miss, without
+running the view again.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from planetarium.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+
+
+def request_fingerprint(data) -> str:
+    """Return a digest identifying the request payload."""
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_key(user, key) -> str:
+    return f"idempotency:{user.pk}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def get_stored_response(user, key):
+    """
+    Return ``(fingerprint, status, body)`` stored for the key, or None.
+    """
+    stored = cache.get(_cache_key(user, key))
+    if stored is None:
+        stored = (
+            IdempotencyKey.objects.filter(
+                user=user, key=key, response_status__isnull=False
+            )
+            .values_list("fingerprint", "response_status", "response_body")
+            .first()
+        )
+        if stored is not None:
+            cache.set(_cache_key(user, key), stored, settings.IDEMPOTENCY_KEY_TTL)
+    return stored
+
+
+def store_response(user, key, fingerprint, status, body) -> None:
+    """Cache a response once the transaction that stored it has committed."""
+    cache.set(
+        _cache_key(user, key),
+        (fingerprint, status, body),
+        settings.IDEMPOTENCY_KEY_TTL,
+    )
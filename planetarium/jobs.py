@@ -0,0 +1,112 @@
+"""
+Database-backed background jobs.
+
+``enqueue`` inserts a ``Job`` row in the caller's transaction, so a job
+exists exactly when the work that caused it was committed. The
+``run_jobs`` worker claims batches of due jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so several workers can drain the
+queue side by side, and runs every handler registered for the job name.
+Failed jobs are retried with exponential backoff.
+
+Jobs run in the claiming transaction, each in its own savepoint, unless
+their handlers are registered with ``atomic=False``. Those are leased
+for ``JOB_LEASE_SECONDS`` instead, by pushing back ``run_after``, and run
+after the claim commits, so that long jobs can commit their work piece
+by piece. A leased job whose worker stopped is claimed again once its
+lease runs out, so such handlers must be safe to run again.
+"""
+
+import logging
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from planetarium.models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = defaultdict(list)
+_detached = set()
+
+
+def task(name, atomic=True):
+    """
+    Register the decorated function as a handler for jobs named ``name``,
+    run outside of the claiming transaction unless ``atomic``.
+    """
+
+    def register(handler):
+        _handlers[name].append(handler)
+        if not atomic:
+            _detached.add(name)
+        return handler
+
+    return register
+
+
+def enqueue(name, **payload) -> Job:
+    """Queue a job running the handlers of ``name`` with ``payload``."""
+    return Job.objects.create(name=name, payload=payload, run_after=timezone.now())
+
+
+def run_job(job) -> None:
+    """Run every handler of the job, raising if the job name is unknown."""
+    handlers = _handlers.get(job.name)
+    if not handlers:
+        raise LookupError(f"No handlers registered for job {job.name!r}")
+    for handler in handlers:
+        handler(**job.payload)
+
+
+def _attempt(job, now, atomic=True) -> None:
+    """Run the job, updating its status and retry schedule in memory."""
+    try:
+        with transaction.atomic() if atomic else nullcontext():
+            run_job(job)
+    except Exception as error:
+        logger.exception("Job %s failed", job)
+        job.attempts += 1
+        job.last_error = repr(error)
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            job.status = Job.FAILED
+        else:
+            job.run_after = now + timedelta(
+                seconds=settings.JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            )
+    else:
+        job.status = Job.DONE
+
+
+def run_batch(batch_size=None) -> int:
+    """
+    Claim and run up to ``batch_size`` due jobs, returning how many ran.
+
+    Each job runs in its own savepoint, so a failing handler only rolls
+    back its own job's work. Jobs registered with ``atomic=False`` run
+    once the claim is committed.
+    """
+    batch_size = batch_size or settings.JOB_BATCH_SIZE
+    now = timezone.now()
+    fields = ("status", "attempts", "run_after", "last_error")
+    detached = []
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True).filter(
+                status=Job.PENDING, run_after__lte=now
+            )[:batch_size]
+        )
+        for job in jobs:
+            if job.name in _detached:
+                job.run_after = now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+                detached.append(job)
+            else:
+                _attempt(job, now)
+        Job.objects.bulk_update(jobs, fields)
+    for job in detached:
+        _attempt(job, timezone.now(), atomic=False)
+        job.save(update_fields=fields)
+    return len(jobs)
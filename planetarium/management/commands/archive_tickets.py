@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from planetarium.archive import archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = "Move tickets of past show sessions to the archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Archive sessions older than this many days "
+            "(default: TICKET_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Tickets moved per transaction (default: TICKET_ARCHIVE_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        archived = 0
+        while True:
+            moved = archive_batch(cutoff, options["batch_size"])
+            if not moved:
+                break
+            archived += moved
+            self.stdout.write(f"Archived {archived} ticket(s)")
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {archived} ticket(s) shown before {cutoff}")
+        )
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from planetarium.views import ShowSessionViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request cost of opening a database connection "
+        "and of re-planning the show session list query"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Number of simulated requests per scenario.",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database alias to benchmark.",
+        )
+
+    def report(self, name, elapsed, requests):
+        self.stdout.write(
+            f"{name:<32} {elapsed / requests * 1000:8.3f} ms/request "
+            f"{requests / elapsed:10.1f} requests/s"
+        )
+
+    def handle(self, *args, **options):
+        requests = options["requests"]
+        connection = connections[options["database"]]
+        params = connection.get_connection_params()
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            raw_connection = connection.get_new_connection(params)
+            raw_connection.cursor().execute("SELECT 1")
+            raw_connection.close()
+        self.report(
+            "new connection per request", time.perf_counter() - started, requests
+        )
+
+        raw_connection = connection.get_new_connection(params)
+        cursor = raw_connection.cursor()
+        started = time.perf_counter()
+        for _ in range(requests):
+            cursor.execute("SELECT 1")
+        self.report("persistent connection", time.perf_counter() - started, requests)
+        raw_connection.close()
+
+        if connection.vendor != "postgresql" or not hasattr(
+            raw_connection, "prepare_threshold"
+        ):
+            self.stdout.write("Prepared statements need PostgreSQL with psycopg 3.")
+            return
+
+        import psycopg
+
+        sql, sql_params = ShowSessionViewSet.list_queryset(
+            ShowSessionViewSet.queryset.all()
+        ).query.sql_with_params()
+        raw_connection = connection.get_new_connection(params)
+        for prepare in (False, True):
+            cursor = psycopg.Cursor(raw_connection)
+            started = time.perf_counter()
+            for _ in range(requests):
+                cursor.execute(sql, sql_params, prepare=prepare)
+                cursor.fetchall()
+            self.report(
+                f"session list, prepared={prepare}",
+                time.perf_counter() - started,
+                requests,
+            )
+        raw_connection.close()
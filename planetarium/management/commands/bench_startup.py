@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: builds the WSGI application, serves one
+# request and reports its own timings and peak RSS as JSON.
+WORKER_SCRIPT = """
+import json, resource, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+
+application = get_wsgi_application()
+loaded = time.perf_counter()
+
+environ = {"PATH_INFO": sys.argv[1]}
+setup_testing_defaults(environ)
+status = []
+b"".join(application(environ, lambda code, headers: status.append(code)))
+served = time.perf_counter()
+
+print(json.dumps({
+    "status": status[0],
+    "setup_ms": (loaded - started) * 1000,
+    "first_request_ms": (served - loaded) * 1000,
+    "modules": len(sys.modules),
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker startup: time to first request, imported modules "
+        "and peak RSS for each settings profile"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-module",
+            action="append",
+            dest="settings_modules",
+            help="Settings profile to measure, may be repeated "
+            "(default: config.settings and config.settings_api).",
+        )
+        parser.add_argument(
+            "--path",
+            default="/api/planetarium/",
+            help="Path of the first request.",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="Fresh worker processes started per profile.",
+        )
+
+    def measure(self, settings_module, path):
+        """Start one worker process and return its report."""
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", WORKER_SCRIPT, path],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        report = json.loads(output.splitlines()[-1])
+        report["total_ms"] = (time.perf_counter() - started) * 1000
+        return report
+
+    def handle(self, *args, **options):
+        settings_modules = options["settings_modules"] or [
+            "config.settings",
+            "config.settings_api",
+        ]
+        for settings_module in settings_modules:
+            reports = [
+                self.measure(settings_module, options["path"])
+                for _ in range(options["runs"])
+            ]
+            best = min(reports, key=lambda report: report["total_ms"])
+            self.stdout.write(
+                f"{settings_module:<24} status {best['status'].split()[0]} "
+                f"process {best['total_ms']:7.1f} ms "
+                f"setup {best['setup_ms']:7.1f} ms "
+                f"first request {best['first_request_ms']:6.1f} ms "
+                f"modules {best['modules']:5d} "
+                f"rss {best['max_rss_kb'] / 1024:6.1f} MiB"
+            )
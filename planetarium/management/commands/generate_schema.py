@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+from config.views import schema_file_path
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema files served by the schema view"
+
+    def handle(self, *args, **options):
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        schema = generator.get_schema(request=None, public=True)
+
+        for renderer in (OpenApiYamlRenderer(), OpenApiJsonRenderer()):
+            path = schema_file_path(renderer.format)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(renderer.render(schema, renderer_context={}))
+            self.stdout.write(self.style.SUCCESS(f"Schema written to {path}"))
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from planetarium.bulk_import import (
+    IMPORTERS,
+    CatalogImportError,
+    import_catalog,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Import show themes, astronomy shows or show sessions from CSV or JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="CSV or JSON file to import.")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "json"),
+            help="File format (default: from the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows per INSERT statement (default: IMPORT_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        try:
+            with path.open("rb") as file:
+                rows = read_rows(file, file_format)
+            result = import_catalog(options["kind"], rows, options["batch_size"])
+        except CatalogImportError as error:
+            for row_error in error.errors:
+                self.stderr.write(f"Row {row_error['row']}: {row_error['errors']}")
+            raise CommandError(f"Nothing imported: {error}")
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read {path}: {error}")
+        message = (
+            f"Imported {result['created']} of {result['rows']} "
+            f"{options['kind'].replace('_', ' ')}"
+        )
+        if "updated" in result:
+            message += f", updated {result['updated']}"
+        self.stdout.write(self.style.SUCCESS(message))
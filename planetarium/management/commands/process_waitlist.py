@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from planetarium.waitlist import process_waitlist
+
+
+class Command(BaseCommand):
+    help = "Offer released seats to users on show session waitlists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to sleep between passes.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run a single pass and exit.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            offered = process_waitlist()
+            if offered:
+                self.stdout.write(f"Offered seats to {len(offered)} waiting user(s)")
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from config.profiling import PROFILE_HEADER, PROFILERS, make_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a signed X-Profile header value that profiles the requests "
+        "carrying it, for a staff user"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the staff user the token is for.")
+        parser.add_argument("--mode", choices=sorted(PROFILERS), default="cprofile")
+
+    def handle(self, *args, **options):
+        user = (
+            get_user_model()
+            .objects.filter(email=options["email"], is_staff=True, is_active=True)
+            .first()
+        )
+        if user is None:
+            raise CommandError(f"No active staff user {options['email']!r}")
+        self.stdout.write(f"{PROFILE_HEADER}: {make_token(user, options['mode'])}")
+        self.stderr.write(
+            f"Valid for {settings.PROFILING_TOKEN_MAX_AGE} s while "
+            f"PROFILING_ENABLED is set"
+        )
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from planetarium.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete stored idempotency keys older than IDEMPOTENCY_KEY_TTL"
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(
+            created_at__lt=timezone.now()
+            - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        ).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} idempotency keys"))
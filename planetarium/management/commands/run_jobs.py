@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from planetarium.jobs import run_batch
+
+
+class Command(BaseCommand):
+    help = "Run background jobs queued in the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Jobs claimed per transaction (default: JOB_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run until the queue has no due jobs, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            ran = run_batch(options["batch_size"])
+            if ran:
+                self.stdout.write(f"Ran {ran} job(s)")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,273 @@
+import multiprocessing
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as ModelValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, OperationalError, connection, connections
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from planetarium.models import AstronomyShow, PlanetariumDome, ShowSession, Ticket
+from planetarium.serializers import ReservationSerializer
+
+BOOKED = "booked"
+CONFLICT = "conflict"
+DEADLOCK = "deadlock"
+LOCK_TIMEOUT = "lock timeout"
+ERROR = "error"
+
+
+def classify(error):
+    """Return the outcome name of a failed booking attempt."""
+    # Seats taken between validation and insert fail the model's own
+    # constraint check in Ticket.save() or, failing that, the index.
+    if isinstance(error, (ValidationError, ModelValidationError, IntegrityError)):
+        return CONFLICT
+    if isinstance(error, OperationalError):
+        sqlstate = getattr(error.__cause__, "sqlstate", None)
+        if sqlstate == "40P01":
+            return DEADLOCK
+        if sqlstate in ("55P03", "57014") or "locked" in str(error):
+            return LOCK_TIMEOUT
+        if sqlstate == "40001":
+            return CONFLICT
+    return ERROR
+
+
+def book(spec):
+    """
+    Make ``spec.attempts`` bookings of adjacent seats in the hot rows,
+    all workers starting at ``spec.start_at``; return ``(outcome,
+    seconds)`` per attempt.
+    """
+    rng = random.Random(spec.seed)
+    user = get_user_model().objects.get(id=spec.user_id)
+    request = SimpleNamespace(user=user)
+    results = []
+    time.sleep(max(0.0, spec.start_at - time.time()))
+    try:
+        for _ in range(spec.attempts):
+            row = rng.randint(1, spec.hot_rows)
+            first = rng.randint(1, spec.seats_in_row - spec.seats_per_booking + 1)
+            data = {
+                "tickets": [
+                    {"row": row, "seat": seat, "show_session": spec.show_session_id}
+                    for seat in range(first, first + spec.seats_per_booking)
+                ]
+            }
+            started = time.perf_counter()
+            try:
+                serializer = ReservationSerializer(
+                    data=data, context={"request": request}
+                )
+                serializer.is_valid(raise_exception=True)
+                serializer.save(user=user)
+                outcome = BOOKED
+            except Exception as error:
+                outcome = classify(error)
+            results.append((outcome, time.perf_counter() - started))
+    finally:
+        connections.close_all()
+    return results
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class LockWaitSampler(threading.Thread):
+    """Sample PostgreSQL for lock requests that are waiting."""
+
+    def __init__(self, database, interval):
+        super().__init__(daemon=True)
+        self.database = database
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            with connections[self.database].cursor() as cursor:
+                while not self.stopped.wait(self.interval):
+                    cursor.execute(
+                        "SELECT count(*) FROM pg_locks l "
+                        "JOIN pg_database d ON d.oid = l.database "
+                        "WHERE NOT l.granted AND d.datname = current_database()"
+                    )
+                    self.samples.append(cursor.fetchone()[0])
+        finally:
+            connections[self.database].close()
+
+    @property
+    def wait_seconds(self):
+        """Estimated total time spent waiting for locks by all workers."""
+        return sum(self.samples) * self.interval
+
+
+class Command(BaseCommand):
+    help = (
+        "Book overlapping seats of one show session from many concurrent "
+        "workers and report throughput, conflicts, deadlocks, lock waits "
+        "and latency, then check that no seat was sold twice"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Run workers as forked processes instead of threads.",
+        )
+        parser.add_argument(
+            "--bookings", type=int, default=50, help="Attempts per worker."
+        )
+        parser.add_argument("--seats-per-booking", type=int, default=2)
+        parser.add_argument("--rows", type=int, default=20)
+        parser.add_argument("--seats-in-row", type=int, default=30)
+        parser.add_argument(
+            "--hot-rows",
+            type=int,
+            default=3,
+            help="Rows all workers compete for.",
+        )
+        parser.add_argument(
+            "--sample-interval",
+            type=float,
+            default=0.01,
+            help="Seconds between lock wait samples (PostgreSQL only).",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the show, session, tickets and users created for the run.",
+        )
+
+    def create_fixture(self, options):
+        dome = PlanetariumDome.objects.create(
+            name="Stress test dome",
+            rows=options["rows"],
+            seats_in_row=options["seats_in_row"],
+        )
+        show = AstronomyShow.objects.create(title="Stress test show")
+        show_session = ShowSession.objects.create(
+            astronomy_show=show,
+            planetarium_dome=dome,
+            show_time=timezone.now() + timedelta(days=1),
+        )
+        users = [
+            get_user_model().objects.get_or_create(email=f"stress-{index}@example.com")
+            for index in range(options["workers"])
+        ]
+        return dome, show, show_session, users
+
+    def handle(self, *args, **options):
+        if options["seats_per_booking"] > options["seats_in_row"]:
+            raise CommandError("--seats-per-booking exceeds --seats-in-row")
+        hot_rows = min(options["hot_rows"], options["rows"])
+        dome, show, show_session, users = self.create_fixture(options)
+        created_user_ids = [user.id for user, created in users if created]
+        start_at = time.time() + 0.5
+        specs = [
+            SimpleNamespace(
+                user_id=user.id,
+                show_session_id=show_session.id,
+                attempts=options["bookings"],
+                seats_per_booking=options["seats_per_booking"],
+                hot_rows=hot_rows,
+                seats_in_row=options["seats_in_row"],
+                start_at=start_at,
+                seed=index,
+            )
+            for index, (user, _) in enumerate(users)
+        ]
+
+        sampler = None
+        if connection.vendor == "postgresql":
+            sampler = LockWaitSampler(connection.alias, options["sample_interval"])
+            sampler.start()
+        if options["processes"]:
+            # Children must not inherit the parent's open connections.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                options["workers"], mp_context=multiprocessing.get_context("fork")
+            )
+        else:
+            executor = ThreadPoolExecutor(options["workers"])
+        with executor:
+            results = [
+                result
+                for worker_results in executor.map(book, specs)
+                for result in worker_results
+            ]
+        elapsed = time.time() - start_at
+        if sampler is not None:
+            sampler.stopped.set()
+            sampler.join()
+
+        try:
+            self.report(results, elapsed, sampler, show_session, options)
+        finally:
+            if not options["keep"]:
+                show.delete()
+                dome.delete()
+                get_user_model().objects.filter(id__in=created_user_ids).delete()
+
+    def report(self, results, elapsed, sampler, show_session, options):
+        outcomes = Counter(outcome for outcome, _ in results)
+        latencies = sorted(seconds * 1000 for _, seconds in results)
+        attempts = len(results)
+        write = self.stdout.write
+
+        write(
+            f"workers {options['workers']} "
+            f"({'processes' if options['processes'] else 'threads'}), "
+            f"{attempts} attempts in {elapsed:.2f} s"
+        )
+        for outcome in (BOOKED, CONFLICT, DEADLOCK, LOCK_TIMEOUT, ERROR):
+            share = outcomes[outcome] / attempts * 100 if attempts else 0
+            write(f"  {outcome:<13} {outcomes[outcome]:6d} {share:6.1f}%")
+        write(
+            f"throughput    {outcomes[BOOKED] / elapsed:8.1f} bookings/s "
+            f"{attempts / elapsed:8.1f} attempts/s"
+        )
+        write(
+            f"latency ms    p50 {percentile(latencies, 0.50):.1f} "
+            f"p95 {percentile(latencies, 0.95):.1f} "
+            f"p99 {percentile(latencies, 0.99):.1f} "
+            f"max {percentile(latencies, 1):.1f}"
+        )
+        if sampler is not None:
+            write(
+                f"lock waits    ~{sampler.wait_seconds:.2f} s total, "
+                f"at most {max(sampler.samples, default=0)} waiting at once"
+            )
+        else:
+            write("lock waits    not sampled (PostgreSQL only)")
+
+        tickets = Ticket.objects.filter(show_session=show_session)
+        sold = tickets.count()
+        double_sold = (
+            tickets.values("row", "seat")
+            .annotate(sales=Count("id"))
+            .filter(sales__gt=1)
+            .count()
+        )
+        expected = outcomes[BOOKED] * options["seats_per_booking"]
+        write(f"seats sold    {sold}, double-sold seats: {double_sold}")
+        if double_sold or sold != expected:
+            raise CommandError(
+                f"Inconsistent sales: {sold} tickets for {expected} booked seats, "
+                f"{double_sold} seats sold more than once"
+            )
+        self.stdout.write(self.style.SUCCESS("No seat was sold twice"))
@@ -1,6 +1,6 @@
 import time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connections
 from django.db.utils import OperationalError
 
@@ -8,14 +8,76 @@ from django.db.utils import OperationalError
 class Command(BaseCommand):
     help = "Wait for db connection before startup"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            action="append",
+            dest="databases",
+            help="Database alias to wait for, may be repeated (default: default).",
+        )
+        parser.add_argument(
+            "--all-databases",
+            action="store_true",
+            help="Wait for every configured database alias.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds to wait in total before giving up.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="Seconds to wait after the first failed attempt.",
+        )
+        parser.add_argument(
+            "--max-interval",
+            type=float,
+            default=5,
+            help="Upper bound for the exponentially growing wait.",
+        )
+
+    @staticmethod
+    def probe(alias):
+        """Run a real query, since getting a connection handle never fails."""
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except OperationalError:
+            connection.close()
+            raise
+
     def handle(self, *args, **options):
-        self.stdout.write("Waiting for database...")
-        db_connection = None
-        while not db_connection:
-            try:
-                db_connection = connections["default"]
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+        if options["all_databases"]:
+            aliases = list(connections)
+        else:
+            aliases = options["databases"] or ["default"]
+
+        deadline = time.monotonic() + options["timeout"]
+
+        for alias in aliases:
+            self.stdout.write(f"Waiting for database {alias!r}...")
+            interval = options["interval"]
+            while True:
+                try:
+                    self.probe(alias)
+                    break
+                except OperationalError as error:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise CommandError(
+                            f"Database {alias!r} unavailable after "
+                            f"{options['timeout']} seconds: {error}"
+                        )
+                    delay = min(interval, remaining)
+                    self.stdout.write(
+                        f"Database {alias!r} unavailable, "
+                        f"waiting {delay:.1f} seconds..."
+                    )
+                    time.sleep(delay)
+                    interval = min(interval * 2, options["max_interval"])
 
         self.stdout.write(self.style.SUCCESS("Database available!"))
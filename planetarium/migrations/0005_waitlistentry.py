@@ -0,0 +1,101 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("planetarium", "0004_alter_astronomyshow_description_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "seats",
+                    models.PositiveIntegerField(
+                        default=1, help_text="The number of seats the user wants."
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("waiting", "Waiting"),
+                            ("offered", "Offered"),
+                            ("claimed", "Claimed"),
+                            ("expired", "Expired"),
+                        ],
+                        default="waiting",
+                        help_text="Position of the entry in the waitlist workflow.",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Date and time when the user joined.",
+                    ),
+                ),
+                (
+                    "offer_expires_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Deadline for booking the offered seats.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "show_session",
+                    models.ForeignKey(
+                        help_text="The sold-out show session the user is waiting for.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to="planetarium.showsession",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        help_text="The user waiting for seats.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "waitlist entries",
+                "ordering": ("id",),
+                "indexes": [
+                    models.Index(
+                        fields=["show_session", "status"],
+                        name="waitlist_session_status",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="waitlistentry",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ("waiting", "offered"))),
+                fields=("show_session", "user"),
+                name="unique_active_waitlist_entry",
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("planetarium", "0007_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTicket",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(
+                        help_text="The id the ticket had in the Ticket table.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("row", models.IntegerField(help_text="The row number of the seat.")),
+                ("seat", models.IntegerField(help_text="The seat number in the row.")),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        help_text="The reservation associated with the ticket.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_tickets",
+                        to="planetarium.reservation",
+                    ),
+                ),
+                (
+                    "show_session",
+                    models.ForeignKey(
+                        help_text="The show session associated with the ticket.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_tickets",
+                        to="planetarium.showsession",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("row", "seat"),
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("planetarium", "0008_archivedticket"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["user", "-created_at"], name="reservation_user_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["reservation"],
+                include=("row", "seat", "show_session"),
+                name="ticket_reservation_covering",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="ticket",
+            constraint=models.UniqueConstraint(
+                fields=("show_session", "row", "seat"), name="unique_ticket_seat"
+            ),
+        ),
+        # Drop the old unique index and the plain foreign key indexes only
+        # once their replacements exist.
+        migrations.AlterUniqueTogether(
+            name="ticket",
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name="reservation",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The user who made the reservation.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reservations",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="reservation",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The reservation associated with the ticket.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tickets",
+                to="planetarium.reservation",
+            ),
+        ),
+    ]
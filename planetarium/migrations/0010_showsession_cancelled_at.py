@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("planetarium", "0009_ticket_constraints_and_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="showsession",
+            name="cancelled_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When the session was cancelled, if it was.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("planetarium", "0010_showsession_cancelled_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="showsession",
+            name="admission_rate",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Users let through the waiting room per second to book this session; leave empty to book without a waiting room.",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,7 +1,11 @@
+from itertools import chain
+
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 from config import settings
+from planetarium.seat_events import SEAT_FREED, publish_seats
 
 
 class ShowTheme(models.Model):
@@ -80,10 +84,29 @@ class ShowSession(models.Model):
     show_time = models.DateTimeField(
         help_text="Enter the date and time of the show session."
     )
+    cancelled_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When the session was cancelled, if it was.",
+    )
+    admission_rate = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Users let through the waiting room per second to book "
+        "this session; leave empty to book without a waiting room.",
+    )
 
     class Meta:
         ordering = ("-show_time",)
 
+    def all_tickets(self):
+        """Return live and archived tickets of the session, by seat."""
+        return sorted(
+            chain(self.tickets.all(), self.archived_tickets.all()),
+            key=lambda ticket: (ticket.row, ticket.seat),
+        )
+
     def __str__(self):
         """String for representing the ShowSession object."""
         return f"{self.planetarium_dome.name} - {self.show_time}"
@@ -99,11 +122,26 @@ class Reservation(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="reservations",
+        db_index=False,
         help_text="The user who made the reservation.",
     )
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Serves a user's reservation history in page order without a
+            # sort, and replaces the plain index on user_id.
+            models.Index(
+                fields=("user", "-created_at"), name="reservation_user_created"
+            ),
+        ]
+
+    def all_tickets(self):
+        """Return live and archived tickets of the reservation, by seat."""
+        return sorted(
+            chain(self.tickets.all(), self.archived_tickets.all()),
+            key=lambda ticket: (ticket.row, ticket.seat),
+        )
 
     def __str__(self):
         """String for representing the Reservation object."""
@@ -125,15 +163,30 @@ class Ticket(models.Model):
         Reservation,
         on_delete=models.CASCADE,
         related_name="tickets",
+        db_index=False,
         help_text="The reservation associated with the ticket.",
     )
 
     class Meta:
-        unique_together = ("show_session", "row", "seat")
         ordering = (
             "row",
             "seat",
         )
+        constraints = [
+            models.UniqueConstraint(
+                fields=("show_session", "row", "seat"), name="unique_ticket_seat"
+            ),
+        ]
+        indexes = [
+            # Lets the tickets of a page of reservations be read from the
+            # index alone on PostgreSQL, and replaces the plain index on
+            # reservation_id.
+            models.Index(
+                fields=("reservation",),
+                include=("row", "seat", "show_session"),
+                name="ticket_reservation_covering",
+            ),
+        ]
 
     @staticmethod
     def validate_ticket(row, seat, planetarium_dome, error_to_raise):
@@ -167,6 +220,202 @@ class Ticket(models.Model):
         self.full_clean()
         super().save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        """Delete method announcing the freed seat to seat map viewers."""
+        publish_seats(
+            self.show_session_id, SEAT_FREED, [{"row": self.row, "seat": self.seat}]
+        )
+        return super().delete(*args, **kwargs)
+
     def __str__(self):
         """String for representing the Ticket object."""
         return f"{str(self.show_session)} (row: {self.row}, seat: {self.seat})"
+
+
+class ArchivedTicket(models.Model):
+    """Model representing a ticket moved out of Ticket after its session."""
+
+    id = models.BigIntegerField(
+        primary_key=True, help_text="The id the ticket had in the Ticket table."
+    )
+    row = models.IntegerField(help_text="The row number of the seat.")
+    seat = models.IntegerField(help_text="The seat number in the row.")
+    show_session = models.ForeignKey(
+        ShowSession,
+        on_delete=models.CASCADE,
+        related_name="archived_tickets",
+        help_text="The show session associated with the ticket.",
+    )
+    reservation = models.ForeignKey(
+        Reservation,
+        on_delete=models.CASCADE,
+        related_name="archived_tickets",
+        help_text="The reservation associated with the ticket.",
+    )
+
+    class Meta:
+        ordering = (
+            "row",
+            "seat",
+        )
+
+    def __str__(self):
+        """String for representing the ArchivedTicket object."""
+        return f"{str(self.show_session)} (row: {self.row}, seat: {self.seat})"
+
+
+class WaitlistEntry(models.Model):
+    """Model representing a user waiting for seats in a sold-out session."""
+
+    WAITING = "waiting"
+    OFFERED = "offered"
+    CLAIMED = "claimed"
+    EXPIRED = "expired"
+    STATUS_CHOICES = (
+        (WAITING, "Waiting"),
+        (OFFERED, "Offered"),
+        (CLAIMED, "Claimed"),
+        (EXPIRED, "Expired"),
+    )
+    ACTIVE_STATUSES = (WAITING, OFFERED)
+
+    show_session = models.ForeignKey(
+        ShowSession,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+        help_text="The sold-out show session the user is waiting for.",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+        help_text="The user waiting for seats.",
+    )
+    seats = models.PositiveIntegerField(
+        default=1, help_text="The number of seats the user wants."
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=WAITING,
+        help_text="Position of the entry in the waitlist workflow.",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Date and time when the user joined."
+    )
+    offer_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Deadline for booking the offered seats.",
+    )
+
+    class Meta:
+        ordering = ("id",)
+        verbose_name_plural = "waitlist entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("show_session", "user"),
+                condition=models.Q(status__in=("waiting", "offered")),
+                name="unique_active_waitlist_entry",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=("show_session", "status"), name="waitlist_session_status"
+            ),
+        ]
+
+    def __str__(self):
+        """String for representing the WaitlistEntry object."""
+        return f"{self.user} waiting for {self.show_session_id} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """Model storing the response to a request sent with an Idempotency-Key."""
+
+    key = models.CharField(
+        max_length=255, help_text="The Idempotency-Key header sent by the client."
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+        help_text="The user who sent the request.",
+    )
+    fingerprint = models.CharField(
+        max_length=64, help_text="SHA-256 of the request payload."
+    )
+    response_status = models.PositiveSmallIntegerField(
+        null=True, help_text="Status code of the stored response."
+    )
+    response_body = models.JSONField(
+        null=True,
+        encoder=DjangoJSONEncoder,
+        help_text="Body of the stored response.",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, db_index=True, help_text="Date and time of the request."
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "key"), name="unique_idempotency_key_per_user"
+            ),
+        ]
+
+    def __str__(self):
+        """String for representing the IdempotencyKey object."""
+        return self.key
+
+
+class Job(models.Model):
+    """Model representing a background job waiting in the database queue."""
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    name = models.CharField(
+        max_length=100, help_text="Name of the task handlers to run."
+    )
+    payload = models.JSONField(
+        default=dict, help_text="Keyword arguments passed to the handlers."
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        help_text="Whether the job still has to run.",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, help_text="Number of failed runs so far."
+    )
+    run_after = models.DateTimeField(
+        help_text="The job is not run before this date and time."
+    )
+    last_error = models.TextField(
+        blank=True, help_text="Error raised by the last failed run."
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Date and time when the job was enqueued."
+    )
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(
+                fields=("run_after", "id"),
+                condition=models.Q(status="pending"),
+                name="job_pending_run_after",
+            ),
+        ]
+
+    def __str__(self):
+        """String for representing the Job object."""
+        return f"{self.name} #{self.id} ({self.status})"
@@ -0,0 +1,115 @@
+"""
+In-process cache of small, rarely changed reference tables.
+
+Planetarium domes and show themes are read on every booking and on
+every page of shows, but change a few times a year. Each process keeps
+the rows it has read in a bounded LRU map. A version number per model,
+stored in the shared Django cache, is bumped whenever a row is saved or
+deleted; a process that sees a newer version drops its entries, so a
+change made by one worker is picked up by all of them on their next
+lookup.
+
+Cached instances are shared between requests and must not be modified.
+Changes made with ``QuerySet.update()`` bypass the version bump.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from planetarium.models import PlanetariumDome, ShowTheme
+
+
+class ReferenceCache:
+    """Bounded, version-checked map of primary keys to model instances."""
+
+    def __init__(self, model, max_size=None):
+        self.model = model
+        self.max_size = max_size
+        self.version_key = f"reference-version:{model._meta.label_lower}"
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_version(self):
+        """Return the shared version of the model's rows."""
+        # A version lost to eviction or a flush restarts from the clock,
+        # never from a number some process may still hold.
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    def bump_version(self):
+        """Invalidate every process's entries for the model."""
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.add(self.version_key, time.time_ns(), timeout=None)
+
+    def get_many(self, pks) -> dict:
+        """
+        Return ``{pk: instance}`` for the given primary keys, reading the
+        ones not cached yet with a single query. Unknown keys are left out.
+        """
+        version = self.get_version()
+        found = {}
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            for pk in pks:
+                if pk in self._entries:
+                    self._entries.move_to_end(pk)
+                    found[pk] = self._entries[pk]
+        missing = set(pks) - found.keys()
+        if missing:
+            loaded = self.model.objects.in_bulk(missing)
+            found.update(loaded)
+            with self._lock:
+                if version == self._version:
+                    self._entries.update(loaded)
+                    max_size = self.max_size or settings.REFERENCE_CACHE_SIZE
+                    while len(self._entries) > max_size:
+                        self._entries.popitem(last=False)
+        return found
+
+    def get(self, pk):
+        """Return the instance with primary key ``pk``."""
+        try:
+            return self.get_many((pk,))[pk]
+        except KeyError:
+            raise self.model.DoesNotExist(
+                f"{self.model._meta.object_name} matching query does not exist."
+            )
+
+    def clear(self):
+        """Drop this process's entries."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+dome_cache = ReferenceCache(PlanetariumDome)
+theme_cache = ReferenceCache(ShowTheme)
+
+_caches = {PlanetariumDome: dome_cache, ShowTheme: theme_cache}
+
+
+def _row_changed(sender, **kwargs):
+    # Bump now for this transaction's own reads, and again after commit
+    # in case another process cached the old row in between.
+    reference_cache = _caches[sender]
+    reference_cache.bump_version()
+    transaction.on_commit(reference_cache.bump_version)
+
+
+for _model in _caches:
+    post_save.connect(_row_changed, sender=_model)
+    post_delete.connect(_row_changed, sender=_model)
@@ -0,0 +1,187 @@
+"""
+Publish/subscribe of seat changes per show session.
+
+The booking path publishes ``seat-taken`` and ``seat-freed`` events, and
+the server-sent events view streams them to seat map viewers. The
+broker class is chosen with the ``SEAT_EVENTS_BROKER`` setting:
+
+* ``InProcessBroker`` fans events out to streams served by the same
+  process;
+* ``PostgresBroker`` sends events through ``NOTIFY`` and runs one
+  ``LISTEN`` connection per process, so every worker sees every event.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SEAT_TAKEN = "seat-taken"
+SEAT_FREED = "seat-freed"
+SESSION_CANCELLED = "cancelled"
+RESYNC = "resync"
+
+
+class InProcessBroker:
+    """Deliver events to subscribers running in this process."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, show_session_id, event):
+        """Send ``event`` to every subscriber of the session."""
+        self.deliver(show_session_id, event)
+
+    def deliver(self, show_session_id, event):
+        """Hand ``event`` to local subscribers, from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(show_session_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, event)
+
+    @staticmethod
+    def _put(queue, event):
+        # A subscriber too slow to keep up loses its backlog and is told
+        # to fetch the seat map again instead.
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            event = {"type": RESYNC, "seats": []}
+        queue.put_nowait(event)
+
+    def subscribe(self, show_session_id):
+        """
+        Return an async context manager yielding an ``asyncio.Queue`` that
+        receives the session's events.
+        """
+        return _Subscription(self, show_session_id)
+
+    def _add(self, show_session_id, subscriber):
+        with self._lock:
+            self._subscribers[show_session_id].add(subscriber)
+
+    def _discard(self, show_session_id, subscriber):
+        with self._lock:
+            self._subscribers[show_session_id].discard(subscriber)
+            if not self._subscribers[show_session_id]:
+                del self._subscribers[show_session_id]
+
+
+class _Subscription:
+    """
+    Registration of one subscriber queue for as long as it is entered.
+
+    A plain class rather than an ``asynccontextmanager`` generator: a
+    streaming response that is dropped mid-stream is finalized by the
+    garbage collector, which could otherwise close a nested generator
+    before the stream that is still inside it.
+    """
+
+    def __init__(self, broker, show_session_id):
+        self.broker = broker
+        self.show_session_id = show_session_id
+        self.subscriber = None
+
+    async def __aenter__(self):
+        self.subscriber = (
+            asyncio.get_running_loop(),
+            asyncio.Queue(maxsize=self.broker.queue_size),
+        )
+        self.broker._add(self.show_session_id, self.subscriber)
+        return self.subscriber[1]
+
+    async def __aexit__(self, *exc_info):
+        self.broker._discard(self.show_session_id, self.subscriber)
+
+
+class PostgresBroker(InProcessBroker):
+    """Share events between worker processes with ``LISTEN``/``NOTIFY``."""
+
+    channel = "seat_events"
+    # NOTIFY payloads must be shorter than 8000 bytes.
+    max_payload_size = 7900
+
+    def __init__(self, queue_size=100, database="default"):
+        super().__init__(queue_size)
+        self.database = database
+        self._listener = None
+
+    def publish(self, show_session_id, event):
+        with connections[self.database].cursor() as cursor:
+            for payload in self.payloads(show_session_id, event):
+                cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def payloads(self, show_session_id, event):
+        """
+        Encode ``event`` as one or more notification payloads, splitting
+        its seats so that every payload fits in a ``NOTIFY``.
+        """
+        seats = event.get("seats", [])
+        header = {"show_session": show_session_id, **event, "seats": []}
+        empty_size = len(json.dumps(header))
+        chunk, size = [], empty_size
+        for seat in seats:
+            # Counted with the ", " separating it from the previous seat.
+            seat_size = len(json.dumps(seat)) + 2
+            if chunk and size + seat_size > self.max_payload_size:
+                yield json.dumps({**header, "seats": chunk})
+                chunk, size = [], empty_size
+            chunk.append(seat)
+            size += seat_size
+        if chunk or not seats:
+            yield json.dumps({**header, "seats": chunk})
+
+    async def listen(self):
+        """Forward notifications from the database to local subscribers."""
+        import psycopg
+
+        database = connections[self.database]
+        params = database.get_connection_params()
+        params.pop("cursor_factory", None)
+        params.pop("context", None)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    autocommit=True, **params
+                ) as listener:
+                    await listener.execute(f"LISTEN {self.channel}")
+                    async for notify in listener.notifies():
+                        event = json.loads(notify.payload)
+                        self.deliver(event.pop("show_session"), event)
+            except psycopg.OperationalError:
+                logger.exception("Seat event listener lost its connection")
+                await asyncio.sleep(1)
+
+    def _add(self, show_session_id, subscriber):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self.listen())
+        super()._add(show_session_id, subscriber)
+
+
+_broker = None
+
+
+def get_broker():
+    """Return the process-wide broker named by ``SEAT_EVENTS_BROKER``."""
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.SEAT_EVENTS_BROKER)()
+    return _broker
+
+
+def publish_seats(show_session_id, event_type, seats):
+    """
+    Publish a seat change once the current transaction commits, so
+    viewers never see seats from a rolled back booking.
+    """
+    event = {"type": event_type, "seats": list(seats)}
+    transaction.on_commit(lambda: get_broker().publish(show_session_id, event))
@@ -1,18 +1,32 @@
-from django.db import transaction
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as ModelValidationError
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from .models import (
+    ArchivedTicket,
     AstronomyShow,
     ShowTheme,
     PlanetariumDome,
     ShowSession,
     Reservation,
     Ticket,
+    WaitlistEntry,
 )
+from . import booking_queue
+from .archive import archive_cutoff
+from .jobs import enqueue
+from .reference_cache import dome_cache
+from .seat_events import SEAT_TAKEN, publish_seats
+from .sparse_fields import SparseFieldsMixin
+from .waiting_room import check_admitted
+from .waitlist import claim_offers, free_seats, held_seats
 
 
-class ShowThemeSerializer(serializers.ModelSerializer):
+class ShowThemeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ShowTheme
         fields = (
@@ -21,7 +35,7 @@ class ShowThemeSerializer(serializers.ModelSerializer):
         )
 
 
-class AstronomyShowSerializer(serializers.ModelSerializer):
+class AstronomyShowSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = AstronomyShow
         fields = (
@@ -42,6 +56,9 @@ class AstronomyShowListSerializer(AstronomyShowSerializer):
 
 class AstronomyShowDetailSerializer(AstronomyShowSerializer):
     show_theme = ShowThemeSerializer(many=True, read_only=True)
+    collapsed_fields = {
+        "show_theme": serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    }
 
     class Meta:
         model = AstronomyShow
@@ -53,7 +70,7 @@ class AstronomyShowDetailSerializer(AstronomyShowSerializer):
         )
 
 
-class PlanetariumDomeSerializer(serializers.ModelSerializer):
+class PlanetariumDomeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = PlanetariumDome
         fields = (
@@ -65,10 +82,33 @@ class PlanetariumDomeSerializer(serializers.ModelSerializer):
         )
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class OncePerRequestRelatedField(serializers.PrimaryKeyRelatedField):
+    """Look each primary key up once for the whole serializer tree."""
+
+    def to_internal_value(self, data):
+        root = self.root
+        if not hasattr(root, "_related_instances"):
+            root._related_instances = {}
+        key = (self.get_queryset().model, str(data))
+        if key not in root._related_instances:
+            root._related_instances[key] = super().to_internal_value(data)
+        return root._related_instances[key]
+
+
+class TicketSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Tickets of one reservation mostly share their session.
+    serializer_related_field = OncePerRequestRelatedField
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
-        planetarium_dome = attrs.get("show_session").planetarium_dome
+        if attrs["show_session"].cancelled_at:
+            raise ValidationError(
+                {"show_session": "This show session has been cancelled."}
+            )
+        planetarium_dome = dome_cache.get(attrs.get("show_session").planetarium_dome_id)
+        # Ticket.clean() checks the seat again on save; give it the cached
+        # dome rather than letting it load its own.
+        attrs["show_session"].planetarium_dome = planetarium_dome
         Ticket.validate_ticket(
             attrs["row"], attrs["seat"], planetarium_dome, ValidationError
         )
@@ -90,7 +130,7 @@ class TicketSeatsSerializer(TicketSerializer):
         fields = ("row", "seat")
 
 
-class ShowSessionSerializer(serializers.ModelSerializer):
+class ShowSessionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ShowSession
         fields = (
@@ -98,6 +138,7 @@ class ShowSessionSerializer(serializers.ModelSerializer):
             "astronomy_show",
             "planetarium_dome",
             "show_time",
+            "admission_rate",
         )
 
 
@@ -128,7 +169,13 @@ class ShowSessionListSerializer(ShowSessionSerializer):
 class ShowSessionDetailSerializer(ShowSessionSerializer):
     astronomy_show = AstronomyShowListSerializer(many=False, read_only=True)
     planetarium_dome = PlanetariumDomeSerializer(many=False, read_only=True)
-    taken_places = TicketSeatsSerializer(source="tickets", many=True, read_only=True)
+    taken_places = TicketSeatsSerializer(
+        source="all_tickets", many=True, read_only=True
+    )
+    collapsed_fields = {
+        "astronomy_show": serializers.PrimaryKeyRelatedField(read_only=True),
+        "planetarium_dome": serializers.PrimaryKeyRelatedField(read_only=True),
+    }
 
     class Meta:
         model = ShowSession
@@ -137,29 +184,152 @@ class ShowSessionDetailSerializer(ShowSessionSerializer):
             "show_time",
             "astronomy_show",
             "planetarium_dome",
+            "admission_rate",
             "taken_places",
         )
 
 
 class TicketListSerializer(TicketSerializer):
     show_session = ShowSessionListSerializer(read_only=True)
+    collapsed_fields = {
+        "show_session": serializers.PrimaryKeyRelatedField(read_only=True)
+    }
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False)
 
     class Meta:
         model = Reservation
         fields = ("id", "created_at", "tickets")
 
+    def validate(self, attrs):
+        data = super(ReservationSerializer, self).validate(attrs=attrs)
+        request = self.context["request"]
+        user = request.user
+        for show_session in {ticket["show_session"] for ticket in attrs["tickets"]}:
+            check_admitted(request, show_session)
+        requested = Counter(ticket["show_session"].id for ticket in attrs["tickets"])
+        for show_session_id, seats in requested.items():
+            if held_seats(show_session_id, exclude_user=user) and seats > free_seats(
+                show_session_id, exclude_user=user
+            ):
+                raise ValidationError(
+                    {"tickets": "Seats in this session are held for the waitlist."}
+                )
+        if self.archived_seats(attrs["tickets"]):
+            raise ValidationError({"tickets": booking_queue.SEAT_TAKEN_ERROR})
+        return data
+
+    @staticmethod
+    def archived_seats(tickets):
+        """
+        Return the seats of ``tickets`` already taken by archived tickets,
+        which the seat checks of the Ticket table do not see.
+        """
+        cutoff = archive_cutoff()
+        seats = {
+            (ticket["show_session"].id, ticket["row"], ticket["seat"])
+            for ticket in tickets
+            if ticket["show_session"].show_time < cutoff
+        }
+        if not seats:
+            return set()
+        taken = ArchivedTicket.objects.filter(
+            show_session_id__in={show_session_id for show_session_id, _, _ in seats}
+        ).values_list("show_session_id", "row", "seat")
+        return seats & set(taken)
+
     def create(self, validated_data):
+        tickets_data = validated_data["tickets"]
+        if (
+            settings.BOOKING_QUEUE_MODE != "off"
+            and len({ticket["show_session"].id for ticket in tickets_data}) == 1
+        ):
+            return booking_queue.book(validated_data["user"], tickets_data)
+        try:
+            return self.create_reservation(validated_data)
+        except (ModelValidationError, IntegrityError):
+            # Seats taken by a concurrent booking since validation.
+            raise ValidationError({"tickets": booking_queue.SEAT_TAKEN_ERROR})
+
+    def create_reservation(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
+            # Tickets were validated by TicketSerializer; the seat
+            # constraint catches seats taken since then.
+            tickets = Ticket.objects.bulk_create(
+                [
+                    Ticket(reservation=reservation, **ticket_data)
+                    for ticket_data in tickets_data
+                ]
+            )
+            taken_seats = defaultdict(list)
+            for ticket in tickets:
+                taken_seats[ticket.show_session_id].append(
+                    {"row": ticket.row, "seat": ticket.seat}
+                )
+            for show_session_id, seats in taken_seats.items():
+                publish_seats(show_session_id, SEAT_TAKEN, seats)
+            claim_offers(reservation.user, list(taken_seats))
+            enqueue("reservation_created", reservation_id=reservation.id)
             return reservation
 
 
 class ReservationListSerializer(ReservationSerializer):
-    tickets = TicketListSerializer(many=True, read_only=True)
+    tickets = TicketListSerializer(source="all_tickets", many=True, read_only=True)
+
+
+class WaitlistEntrySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    def validate(self, attrs):
+        data = super(WaitlistEntrySerializer, self).validate(attrs=attrs)
+        if attrs["show_session"].cancelled_at:
+            raise ValidationError(
+                {"show_session": "This show session has been cancelled."}
+            )
+        if attrs.get("seats", 1) <= free_seats(attrs["show_session"].id):
+            raise ValidationError(
+                {"show_session": "Tickets are still available for this session."}
+            )
+        if WaitlistEntry.objects.filter(
+            show_session=attrs["show_session"],
+            user=self.context["request"].user,
+            status__in=WaitlistEntry.ACTIVE_STATUSES,
+        ).exists():
+            raise ValidationError(
+                {"show_session": "You are already on the waitlist for this session."}
+            )
+        return data
+
+    class Meta:
+        model = WaitlistEntry
+        fields = (
+            "id",
+            "show_session",
+            "seats",
+            "status",
+            "created_at",
+            "offer_expires_at",
+        )
+        read_only_fields = ("status", "created_at", "offer_expires_at")
+
+
+class ShowThemeImportSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+
+
+class AstronomyShowImportSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=100)
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+    show_theme = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False
+    )
+
+
+class ShowSessionImportSerializer(serializers.Serializer):
+    astronomy_show = serializers.CharField(max_length=100)
+    planetarium_dome = serializers.CharField(max_length=100)
+    show_time = serializers.DateTimeField()
@@ -0,0 +1,121 @@
+"""
+Sparse fieldsets and expansion controls for read requests.
+
+``?fields=id,show_time,tickets.row`` keeps only the listed fields, with
+dots reaching into nested objects; a nested field listed on its own
+keeps all of its fields. ``?expand=`` lists the nested relations to
+render as objects: once it is given, even empty, every other relation
+that can be collapsed is rendered as its id instead. Without either
+parameter responses are unchanged.
+
+Serializers apply both through ``SparseFieldsMixin``, unless the view
+passes its own ``(fields, expand)`` as the ``sparse_fields`` context.
+Viewsets read the same parameters with ``sparse_fields`` to fetch only
+the columns, joins and prefetches the remaining fields render. Both only act on safe
+methods, so request bodies are always validated against every field.
+"""
+
+import copy
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+from config.openapi import OpenApiParameter, OpenApiTypes
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description="Comma-separated fields to return, dots for nested ones "
+        "(ex. ?fields=id,show_time,astronomy_show.title)",
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description="Comma-separated relations to render as objects, all "
+        "others are rendered as ids (ex. ?expand=tickets.show_session)",
+    ),
+]
+
+
+def parse_paths(value):
+    """
+    Turn ``"a,b.c,b.d"`` into ``{"a": {}, "b": {"c": {}, "d": {}}}``, or
+    return None for a missing parameter.
+    """
+    if value is None:
+        return None
+    tree = {}
+    for path in filter(None, (path.strip() for path in value.split(","))):
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def sparse_fields(request):
+    """Return the ``(fields, expand)`` trees requested, None where absent."""
+    if getattr(request, "method", None) not in SAFE_METHODS:
+        return None, None
+    params = request.query_params
+    return parse_paths(params.get("fields")), parse_paths(params.get("expand"))
+
+
+def includes(fields, name) -> bool:
+    """Return whether ``fields`` keeps the field ``name``."""
+    return fields is None or name in fields
+
+
+def nested(tree, name):
+    """Return the subtree for the nested field ``name``."""
+    if tree is None:
+        return None
+    return tree.get(name) or None
+
+
+def expands(expand, *path) -> bool:
+    """Return whether the relation at ``path`` is rendered as an object."""
+    for name in path:
+        if expand is None:
+            return True
+        if name not in expand:
+            return False
+        expand = expand[name]
+    return True
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin trimming fields to ``?fields=`` and rendering the
+    relations in ``collapsed_fields`` with their collapsed field unless
+    they are listed in ``?expand=``.
+    """
+
+    collapsed_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if hasattr(self, "_sparse"):
+            only, expand = self._sparse
+        elif self.parent is None or (
+            isinstance(self.parent, ListSerializer) and self.parent.parent is None
+        ):
+            only, expand = self.context.get("sparse_fields") or sparse_fields(
+                self.context.get("request")
+            )
+        else:
+            only, expand = None, None
+
+        if only is not None:
+            fields = {name: field for name, field in fields.items() if name in only}
+        for name, field in fields.items():
+            if name in self.collapsed_fields and not expands(expand, name):
+                fields[name] = copy.deepcopy(self.collapsed_fields[name])
+                continue
+            serializer = getattr(field, "child", field)
+            if isinstance(serializer, SparseFieldsMixin):
+                serializer._sparse = (
+                    nested(only, name),
+                    None if expand is None else expand.get(name, {}),
+                )
+        return fields
@@ -0,0 +1,28 @@
+"""
+Handlers for background jobs, see ``planetarium.jobs``.
+"""
+
+import logging
+
+from planetarium import cancellation
+from planetarium.jobs import task
+
+logger = logging.getLogger(__name__)
+
+
+@task("reservation_created")
+def log_reservation(reservation_id):
+    """Record the new reservation; further side effects register alongside."""
+    logger.info("Reservation %s created", reservation_id)
+
+
+@task(cancellation.PURGE_SHOW_SESSION, atomic=False)
+def purge_show_session(show_session_id, archive=False):
+    """Remove the next chunks of a cancelled session's tickets."""
+    cancellation.purge_show_session(show_session_id, archive)
+
+
+@task(cancellation.PURGE_ASTRONOMY_SHOW, atomic=False)
+def purge_astronomy_show(astronomy_show_id, archive=False):
+    """Remove the next chunks of a cancelled show's sessions."""
+    cancellation.purge_astronomy_show(astronomy_show_id, archive)
@@ -6,6 +6,9 @@ from .views import (
     PlanetariumDomeViewSet,
     ShowSessionViewSet,
     ReservationViewSet,
+    WaitlistEntryViewSet,
+    CatalogImportView,
+    show_session_seat_events,
 )
 
 
@@ -17,8 +20,15 @@ router.register("show_themes", ShowThemeViewSet)
 router.register("planetarium_domes", PlanetariumDomeViewSet)
 router.register("show_sessions", ShowSessionViewSet)
 router.register("reservations", ReservationViewSet)
+router.register("waitlist", WaitlistEntryViewSet)
 
 
 urlpatterns = [
+    path(
+        "show_sessions/<int:pk>/events/",
+        show_session_seat_events,
+        name="showsession-events",
+    ),
+    path("import/<str:kind>/", CatalogImportView.as_view(), name="catalog-import"),
     path("", include(router.urls)),
 ]
@@ -1,20 +1,70 @@
+import asyncio
+import copy
+import json
+import math
+from contextlib import ExitStack
 from datetime import datetime
 
-from django.db.models import Count, F
-from drf_spectacular.types import OpenApiTypes
-from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, mixins
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
-
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from config.openapi import OpenApiParameter, OpenApiTypes, extend_schema
+from config.routers import can_read_from_replica, pin_to_primary, replica_reads
+from planetarium.bulk_import import (
+    IMPORTERS,
+    CatalogImportError,
+    import_catalog,
+    read_rows,
+)
+from planetarium.cancellation import cancel_show_session
+from planetarium.fast_serializers import (
+    AstronomyShowListValuesSerializer,
+    ShowSessionListValuesSerializer,
+    ReservationListValuesSerializer,
+)
+from planetarium.idempotency import (
+    HEADER as IDEMPOTENCY_HEADER,
+    get_stored_response,
+    request_fingerprint,
+    store_response,
+)
 from planetarium.models import (
+    ArchivedTicket,
     AstronomyShow,
     ShowTheme,
     PlanetariumDome,
     ShowSession,
     Reservation,
+    Ticket,
+    WaitlistEntry,
+    IdempotencyKey,
 )
 from planetarium.permissions import IsAdminOrIfAuthenticatedReadOnly
+from planetarium.seat_events import get_broker
+from planetarium.sparse_fields import (
+    SPARSE_FIELDS_PARAMETERS,
+    expands,
+    includes,
+    nested,
+    sparse_fields,
+)
+from planetarium.waiting_room import QUEUE_TOKEN_HEADER, join, queue_status, read_token
 from planetarium.serializers import (
     AstronomyShowSerializer,
     AstronomyShowDetailSerializer,
@@ -26,10 +76,135 @@ from planetarium.serializers import (
     ShowSessionDetailSerializer,
     ReservationSerializer,
     ReservationListSerializer,
+    WaitlistEntrySerializer,
 )
 
 
+class ReplicaReadMixin:
+    """
+    Serve safe-method requests from a read replica, except for users
+    pinned to the primary by a recent write.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        """
+        Start routing reads to a replica once the user is authenticated.
+        """
+        super().initial(request, *args, **kwargs)
+        self._replica_reads = ExitStack()
+        if request.method in SAFE_METHODS and can_read_from_replica(
+            request.user, request
+        ):
+            self._replica_reads.enter_context(replica_reads())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """
+        Stop routing reads to a replica and pin the user after a write.
+        """
+        if hasattr(self, "_replica_reads"):
+            self._replica_reads.close()
+        if request.method not in SAFE_METHODS and status.is_success(
+            response.status_code
+        ):
+            pin_to_primary(request.user, response)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    Serve the ``list`` action from a ``ValuesSerializer`` when
+    ``FAST_LIST_SERIALIZERS`` is enabled.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        """
+        List objects from ``QuerySet.values()`` rows instead of model instances.
+        """
+        if not (
+            self.values_serializer_class
+            and getattr(settings, "FAST_LIST_SERIALIZERS", False)
+        ) or any(
+            param in request.query_params for param in ("fields", "expand", "include")
+        ):
+            return super().list(request, *args, **kwargs)
+
+        values_serializer = self.values_serializer_class()
+        queryset = values_serializer.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.render(page))
+
+        return Response(values_serializer.render(list(queryset)))
+
+
+class IdempotentCreateMixin:
+    """
+    Answer ``create`` requests retried with the same ``Idempotency-Key``
+    header with the stored response instead of creating again.
+    """
+
+    def replay(self, stored, fingerprint):
+        """Return the stored response, if it was for the same payload."""
+        stored_fingerprint, status_code, body = stored
+        if stored_fingerprint != fingerprint:
+            return Response(
+                {
+                    "detail": f"{IDEMPOTENCY_HEADER} was already used "
+                    f"with a different request."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(
+            body, status=status_code, headers={"Idempotent-Replayed": "true"}
+        )
+
+    def create(self, request, *args, **kwargs):
+        """
+        Create once per Idempotency-Key and replay the response afterwards.
+        """
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_HEADER} must be at most 255 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_fingerprint(request.data)
+        stored = get_stored_response(request.user, key)
+        if stored is not None:
+            return self.replay(stored, fingerprint)
+
+        try:
+            with transaction.atomic():
+                # Inserting the key first makes a concurrent duplicate wait
+                # on the unique constraint until this request commits.
+                record = IdempotencyKey.objects.create(
+                    user=request.user, key=key, fingerprint=fingerprint
+                )
+                response = super().create(request, *args, **kwargs)
+                record.response_status = response.status_code
+                record.response_body = response.data
+                record.save(update_fields=("response_status", "response_body"))
+        except IntegrityError:
+            stored = get_stored_response(request.user, key)
+            if stored is None:
+                raise
+            return self.replay(stored, fingerprint)
+
+        store_response(
+            request.user, key, fingerprint, response.status_code, response.data
+        )
+        return response
+
+
 class AstronomyShowViewSet(
+    ReplicaReadMixin,
+    ValuesListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -39,7 +214,9 @@ class AstronomyShowViewSet(
 
     queryset = AstronomyShow.objects.all()
     serializer_class = AstronomyShowSerializer
+    values_serializer_class = AstronomyShowListValuesSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "catalog"
 
     @staticmethod
     def _params_to_ints(qs):
@@ -64,8 +241,21 @@ class AstronomyShowViewSet(
             show_theme_ids = self._params_to_ints(show_theme)
             queryset = queryset.filter(show_theme__id__in=show_theme_ids)
 
+        if self.action in ("list", "retrieve"):
+            queryset = self.select_fields(queryset)
+
         return queryset.distinct()
 
+    def select_fields(self, queryset):
+        """
+        Fetch only the columns and themes the requested fields render.
+        """
+        fields, _ = sparse_fields(self.request)
+        columns = [name for name in ("title", "description") if includes(fields, name)]
+        if includes(fields, "show_theme"):
+            queryset = queryset.prefetch_related("show_theme")
+        return queryset.only("id", *columns)
+
     def get_serializer_class(self):
         """
         Return the appropriate serializer class based on the action.
@@ -89,6 +279,7 @@ class AstronomyShowViewSet(
                 description="Filter AstronomyShow by show_theme id "
                 "(ex. ?show_theme=1,3)",
             ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -98,38 +289,45 @@ class AstronomyShowViewSet(
         return super().list(request, *args, **kwargs)
 
 
-class ShowThemeViewSet(viewsets.ModelViewSet):
+class ShowThemeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Viewset for managing show themes."""
 
     queryset = ShowTheme.objects.all()
     serializer_class = ShowThemeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "catalog"
 
 
-class PlanetariumDomeViewSet(viewsets.ModelViewSet):
+class PlanetariumDomeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Viewset for managing planetarium domes."""
 
     queryset = PlanetariumDome.objects.all()
     serializer_class = PlanetariumDomeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "catalog"
 
 
-class ShowSessionViewSet(viewsets.ModelViewSet):
+class ShowSessionViewSet(ReplicaReadMixin, ValuesListMixin, viewsets.ModelViewSet):
     """Viewset for managing show sessions."""
 
-    queryset = (
-        ShowSession.objects.all()
-        .select_related("astronomy_show", "planetarium_dome")
-        .annotate(
-            tickets_available=(
-                F("planetarium_dome__rows") * F("planetarium_dome__seats_in_row")
-                - Count("tickets")
-            )
-        )
-    )
+    queryset = ShowSession.objects.filter(cancelled_at__isnull=True)
     serializer_class = ShowSessionSerializer
+    values_serializer_class = ShowSessionListValuesSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @property
+    def throttle_scope(self):
+        """
+        Throttle the seat map of a single session apart from the catalog.
+        """
+        return "seat_map" if self.action == "retrieve" else "catalog"
+
+    def perform_destroy(self, instance):
+        """
+        Cancel the session and remove its tickets in the background.
+        """
+        cancel_show_session(instance.id)
+
     def get_queryset(self):
         """
         Filter queryset based on query parameters.
@@ -137,7 +335,7 @@ class ShowSessionViewSet(viewsets.ModelViewSet):
         date = self.request.query_params.get("date")
         astronomy_show_id_str = self.request.query_params.get("astronomy_show")
 
-        queryset = self.queryset
+        queryset = super().get_queryset()
 
         if date:
             date = datetime.strptime(date, "%Y-%m-%d").date()
@@ -146,8 +344,151 @@ class ShowSessionViewSet(viewsets.ModelViewSet):
         if astronomy_show_id_str:
             queryset = queryset.filter(astronomy_show_id=int(astronomy_show_id_str))
 
+        if self.action == "list":
+            queryset = self.select_list_fields(queryset)
+        elif self.action == "retrieve":
+            queryset = self.select_detail_fields(queryset)
+
         return queryset
 
+    def select_list_fields(self, queryset):
+        """
+        Join and annotate only what the requested list fields render.
+        """
+        fields, _ = sparse_fields(self.request)
+        return self.list_queryset(queryset, fields)
+
+    @staticmethod
+    def list_queryset(queryset, fields=None):
+        """
+        Join and annotate what the list renders of ``fields``, every
+        field by default.
+        """
+        columns = [name for name in ("show_time",) if includes(fields, name)]
+        if includes(fields, "astronomy_show"):
+            queryset = queryset.select_related("astronomy_show")
+            columns += ["astronomy_show", "astronomy_show__title"]
+        if any(
+            includes(fields, name)
+            for name in (
+                "planetarium_dome",
+                "planetarium_dome_capacity",
+                "tickets_available",
+            )
+        ):
+            queryset = queryset.select_related("planetarium_dome")
+            columns += [
+                "planetarium_dome",
+                "planetarium_dome__name",
+                "planetarium_dome__rows",
+                "planetarium_dome__seats_in_row",
+            ]
+        if includes(fields, "tickets_available"):
+            # Sessions past the archive cutoff keep their tickets in
+            # ArchivedTicket; a subquery counts them without multiplying
+            # the rows Count() runs over.
+            archived = (
+                ArchivedTicket.objects.filter(show_session=OuterRef("pk"))
+                .order_by()
+                .values("show_session")
+                .annotate(count=Count("id"))
+                .values("count")
+            )
+            queryset = queryset.annotate(
+                tickets_available=(
+                    F("planetarium_dome__rows") * F("planetarium_dome__seats_in_row")
+                    - Count("tickets")
+                    - Coalesce(Subquery(archived), 0)
+                )
+            )
+        return queryset.only("id", *columns)
+
+    def select_detail_fields(self, queryset):
+        """
+        Join and prefetch only what the requested detail fields render.
+        """
+        fields, expand = sparse_fields(self.request)
+        columns = [
+            name for name in ("show_time", "admission_rate") if includes(fields, name)
+        ]
+        for name in ("astronomy_show", "planetarium_dome"):
+            if includes(fields, name):
+                columns.append(name)
+                if expands(expand, name):
+                    queryset = queryset.select_related(name)
+        if (
+            includes(fields, "astronomy_show")
+            and expands(expand, "astronomy_show")
+            and includes(nested(fields, "astronomy_show"), "show_theme")
+        ):
+            queryset = queryset.prefetch_related("astronomy_show__show_theme")
+        if includes(fields, "taken_places"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.only("row", "seat", "show_session"),
+                ),
+                Prefetch(
+                    "archived_tickets",
+                    queryset=ArchivedTicket.objects.only("row", "seat", "show_session"),
+                ),
+            )
+        return queryset.only("id", *columns)
+
+    @extend_schema(
+        request=None,
+        responses={200: OpenApiTypes.OBJECT},
+        parameters=[
+            OpenApiParameter(
+                QUEUE_TOKEN_HEADER,
+                location=OpenApiParameter.HEADER,
+                required=False,
+                description="Token returned when joining, to check its place (GET)",
+            ),
+        ],
+    )
+    @action(
+        detail=True,
+        methods=["get", "post"],
+        url_path="waiting_room",
+        permission_classes=(IsAuthenticated,),
+    )
+    def waiting_room(self, request, pk=None):
+        """
+        Join the session's waiting room (POST), or check the place of the
+        Queue-Token in it (GET). Tickets of a session with a waiting room
+        are booked with an admitted token in the Queue-Token header.
+        """
+        show_session = get_object_or_404(
+            ShowSession.objects.filter(cancelled_at__isnull=True).only(
+                "id", "admission_rate"
+            ),
+            pk=pk,
+        )
+        if not show_session.admission_rate:
+            return Response(
+                {
+                    "token": None,
+                    "position": None,
+                    "admitted": True,
+                    "estimated_wait_seconds": 0,
+                }
+            )
+        if request.method == "POST":
+            data = join(show_session, request.user)
+        else:
+            position = read_token(
+                request.headers.get(QUEUE_TOKEN_HEADER), show_session, request.user
+            )
+            data = queue_status(show_session, request.user.id, position)
+        headers = {}
+        if not data["admitted"]:
+            poll_after = min(
+                data["estimated_wait_seconds"], settings.WAITING_ROOM_POLL_SECONDS
+            )
+            headers["Retry-After"] = str(max(1, math.ceil(poll_after)))
+        return Response(data, headers=headers)
+
     def get_serializer_class(self):
         """
         Return appropriate serializer class based on action.
@@ -172,6 +513,7 @@ class ShowSessionViewSet(viewsets.ModelViewSet):
                 type=OpenApiTypes.DATE,
                 description="Filter show sessions by date " "(ex. ?date=2022-10-23)",
             ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -189,6 +531,9 @@ class ReservationPagination(PageNumberPagination):
 
 
 class ReservationViewSet(
+    ReplicaReadMixin,
+    IdempotentCreateMixin,
+    ValuesListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet,
@@ -200,14 +545,75 @@ class ReservationViewSet(
         "tickets__show_session__planetarium_dome",
     )
     serializer_class = ReservationSerializer
+    values_serializer_class = ReservationListValuesSerializer
     permission_classes = (IsAuthenticated,)
     pagination_class = ReservationPagination
 
+    @property
+    def throttle_scope(self):
+        """
+        Throttle booking apart from reading the reservation history.
+        """
+        return "reservation_write" if self.action == "create" else None
+
+    def includes_show_sessions(self):
+        """
+        Whether tickets refer to their sessions by id, each session being
+        listed once in the ``included`` block of the response.
+        """
+        return (
+            self.action == "list"
+            and self.request.query_params.get("include") == "show_sessions"
+        )
+
+    def requested_fields(self):
+        """
+        Return the ``(fields, expand)`` to render, never expanding the
+        sessions of tickets when they are included separately.
+        """
+        fields, expand = sparse_fields(self.request)
+        if self.includes_show_sessions():
+            expand = copy.deepcopy(expand) if expand is not None else {}
+            expand.get("tickets", {}).pop("show_session", None)
+        return fields, expand
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["sparse_fields"] = self.requested_fields()
+        return context
+
     def get_queryset(self):
         """
         Get the reservations associated with the current user.
         """
-        return Reservation.objects.filter(user=self.request.user)
+        queryset = Reservation.objects.filter(user=self.request.user)
+        if self.action == "list":
+            queryset = self.select_fields(queryset)
+        return queryset
+
+    def select_fields(self, queryset):
+        """
+        Prefetch the tickets, and their sessions, only when they are rendered.
+        """
+        fields, expand = self.requested_fields()
+        columns = [name for name in ("created_at",) if includes(fields, name)]
+        if includes(fields, "tickets"):
+            tickets = Ticket.objects.all()
+            archived_tickets = ArchivedTicket.objects.all()
+            if includes(nested(fields, "tickets"), "show_session") and expands(
+                expand, "tickets", "show_session"
+            ):
+                related = (
+                    "show_session__astronomy_show",
+                    "show_session__planetarium_dome",
+                )
+                tickets = tickets.select_related(*related)
+                archived_tickets = archived_tickets.select_related(*related)
+            queryset = queryset.prefetch_related(
+                Prefetch("tickets", queryset=tickets),
+                Prefetch("archived_tickets", queryset=archived_tickets),
+            )
+        return queryset.only("id", *columns)
 
     def get_serializer_class(self):
         """
@@ -223,3 +629,190 @@ class ReservationViewSet(
         Set the user when creating a new reservation.
         """
         serializer.save(user=self.request.user)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "include",
+                type=OpenApiTypes.STR,
+                enum=["show_sessions"],
+                description="Refer to show sessions by id in tickets and list "
+                "each of them once under `included` (ex. ?include=show_sessions)",
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """
+        List the user's reservations, optionally with their show sessions
+        side-loaded.
+        """
+        if not self.includes_show_sessions():
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        data = self.get_serializer(page, many=True).data
+        show_session_ids = {
+            ticket["show_session"]
+            for reservation in data
+            for ticket in reservation.get("tickets", ())
+            if "show_session" in ticket
+        }
+        show_sessions = ShowSession.objects.filter(
+            id__in=show_session_ids
+        ).select_related("astronomy_show", "planetarium_dome")
+        response = self.get_paginated_response(data)
+        response.data["included"] = {
+            "show_sessions": ShowSessionListSerializer(
+                show_sessions.order_by("id"), many=True
+            ).data
+        }
+        return response
+
+
+class WaitlistEntryViewSet(
+    ReplicaReadMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """A ViewSet for joining, listing and leaving show session waitlists."""
+
+    queryset = WaitlistEntry.objects.all()
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        """
+        Get the waitlist entries of the current user.
+        """
+        return WaitlistEntry.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        """
+        Set the user when joining a waitlist.
+        """
+        serializer.save(user=self.request.user)
+
+
+class CatalogImportView(APIView):
+    """Bulk import show themes, astronomy shows or show sessions."""
+
+    permission_classes = (IsAdminUser,)
+    parser_classes = (JSONParser, MultiPartParser)
+
+    @extend_schema(
+        request={
+            "application/json": OpenApiTypes.OBJECT,
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            },
+        },
+        responses={201: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+    )
+    def post(self, request, kind):
+        """
+        Import a JSON list of rows, or an uploaded CSV or JSON ``file``.
+        Nothing is written unless every row is valid.
+        """
+        if kind not in IMPORTERS:
+            raise Http404(f"Unknown import kind {kind!r}.")
+        upload = request.FILES.get("file")
+        try:
+            if upload is None:
+                rows = request.data
+            else:
+                file_format = "csv" if upload.name.lower().endswith(".csv") else "json"
+                rows = read_rows(upload, file_format)
+            result = import_catalog(kind, rows)
+        except CatalogImportError as error:
+            return Response(
+                {"errors": error.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except ValueError as error:
+            return Response(
+                {"errors": [{"row": None, "errors": str(error)}]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+def _authenticate(request):
+    """Return the user authenticated by the request's JWT, or None."""
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return authenticated and authenticated[0]
+
+
+def _taken_seats(show_session_id):
+    """Return the taken seats of a show session, archived ones included."""
+    return list(
+        Ticket.objects.filter(show_session_id=show_session_id)
+        .order_by()
+        .values("row", "seat")
+        .union(
+            ArchivedTicket.objects.filter(show_session_id=show_session_id)
+            .order_by()
+            .values("row", "seat"),
+            all=True,
+        )
+    )
+
+
+def _format_event(event_type, seats):
+    """Format one server-sent event."""
+    return f"event: {event_type}\ndata: {json.dumps({'seats': seats})}\n\n"
+
+
+async def _seat_event_stream(show_session_id):
+    """
+    Yield the current seat map, then every seat change of the session.
+    """
+    async with get_broker().subscribe(show_session_id) as events:
+        # Subscribing before reading the snapshot means no change made in
+        # between is lost; at worst it is sent twice.
+        seats = await sync_to_async(_taken_seats)(show_session_id)
+        yield _format_event("snapshot", seats)
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    events.get(), settings.SEAT_EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _format_event(event["type"], event["seats"])
+
+
+async def show_session_seat_events(request, pk):
+    """
+    Stream seat-taken and seat-freed changes of a show session as
+    server-sent events. Only served by the ASGI application: WSGI
+    servers buffer the endless stream, holding a worker forever.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Seat events are only streamed by the ASGI application."},
+            status=501,
+        )
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    exists = await sync_to_async(ShowSession.objects.filter(pk=pk).exists)()
+    if not exists:
+        raise Http404("No ShowSession matches the given query.")
+
+    response = StreamingHttpResponse(
+        _seat_event_stream(pk), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,129 @@
+"""
+Virtual waiting room for hot show sessions.
+
+A session with an ``admission_rate`` is hot: booking it needs a queue
+token, which a user gets by joining the session's waiting room. Users
+are numbered in the order they join, and the room admits
+``admission_rate`` positions per second from the moment it opened, so
+they are let through first come, first served at a steady rate without
+any background worker. An admitted token lets its user book the session
+for ``WAITING_ROOM_ADMISSION_SECONDS``; after that the user has to join
+again, at the back of the queue.
+
+The queue state (when the room opened, the last position handed out and
+each user's position) lives in the Django cache, which must be shared
+by every process (``CACHE_BACKEND``) for the queue to be fair across
+them; the default local memory cache is a single-process stand-in.
+"""
+
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from rest_framework.exceptions import PermissionDenied
+
+QUEUE_TOKEN_HEADER = "Queue-Token"
+_SALT = "planetarium.waiting_room"
+
+
+def _key(show_session_id, name):
+    return f"waiting_room:{show_session_id}:{name}"
+
+
+def _opened_at(show_session_id):
+    cache.add(_key(show_session_id, "opened"), time.time(), timeout=None)
+    return cache.get(_key(show_session_id, "opened"))
+
+
+def _incr(key, delta=1):
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, timeout=None):
+            return delta
+        return cache.incr(key, delta)
+
+
+def admitted_at(show_session, position) -> float:
+    """Return the time at which ``position`` is let into the session."""
+    return _opened_at(show_session.id) + position / show_session.admission_rate
+
+
+def _take_position(show_session):
+    position = _incr(_key(show_session.id, "last"))
+    rate = show_session.admission_rate
+    frontier = int((time.time() - _opened_at(show_session.id)) * rate)
+    # After a quiet spell the admitted positions run ahead of the queue;
+    # skip the unused ones, so that a new rush is not let in all at once.
+    if position < frontier - rate:
+        position = _incr(_key(show_session.id, "last"), frontier - position)
+    return position
+
+
+def _expired(show_session, position):
+    return (
+        admitted_at(show_session, position) + settings.WAITING_ROOM_ADMISSION_SECONDS
+        <= time.time()
+    )
+
+
+def queue_status(show_session, user_id, position) -> dict:
+    """Return the token and the place in the queue of ``position``."""
+    wait = max(0.0, admitted_at(show_session, position) - time.time())
+    return {
+        "token": signing.dumps(
+            {"show_session": show_session.id, "user": user_id, "position": position},
+            salt=_SALT,
+        ),
+        "position": position,
+        "admitted": wait == 0,
+        "estimated_wait_seconds": round(wait, 1),
+    }
+
+
+def join(show_session, user) -> dict:
+    """
+    Put ``user`` in the session's waiting room, keeping their place if
+    they are already waiting or admitted, and return their status.
+    """
+    user_key = _key(show_session.id, f"user:{user.id}")
+    position = cache.get(user_key)
+    if position is None or _expired(show_session, position):
+        position = _take_position(show_session)
+        cache.set(user_key, position, timeout=None)
+    return queue_status(show_session, user.id, position)
+
+
+def read_token(token, show_session, user) -> int:
+    """
+    Return the position in ``token``, raising ``PermissionDenied`` unless
+    it was issued to ``user`` for ``show_session`` and is still valid.
+    """
+    try:
+        data = signing.loads(token or "", salt=_SALT)
+    except signing.BadSignature:
+        data = {}
+    if data.get("show_session") != show_session.id or data.get("user") != user.id:
+        raise PermissionDenied(
+            f"Booking this session needs a {QUEUE_TOKEN_HEADER} "
+            "from its waiting room."
+        )
+    if _expired(show_session, data["position"]):
+        raise PermissionDenied("Your admission has expired, join the queue again.")
+    return data["position"]
+
+
+def check_admitted(request, show_session) -> None:
+    """
+    Raise ``PermissionDenied`` unless the request may book ``show_session``
+    now, i.e. the session is not hot or the request's queue token has
+    been admitted.
+    """
+    if not show_session.admission_rate:
+        return
+    position = read_token(
+        request.headers.get(QUEUE_TOKEN_HEADER), show_session, request.user
+    )
+    if admitted_at(show_session, position) > time.time():
+        raise PermissionDenied("Your place in the queue has not been admitted yet.")
@@ -0,0 +1,134 @@
+"""
+Waitlist for sold-out show sessions.
+
+Users join a FIFO queue of ``WaitlistEntry`` rows per session. The
+``process_waitlist`` worker offers released seats to the head of each
+queue. An offer holds its seats for ``WAITLIST_CLAIM_SECONDS``; other
+users cannot book them until it is claimed by a reservation or expires.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from planetarium.models import ShowSession, WaitlistEntry
+
+logger = logging.getLogger(__name__)
+
+
+class LoggingNotifier:
+    """Notifier used until a real delivery channel is configured."""
+
+    def notify(self, entry):
+        logger.info(
+            "Offering %s seat(s) in show session %s to %s until %s",
+            entry.seats,
+            entry.show_session_id,
+            entry.user_id,
+            entry.offer_expires_at,
+        )
+
+
+def get_notifier():
+    """Return an instance of the notifier class named in settings."""
+    return import_string(settings.WAITLIST_NOTIFIER)()
+
+
+def held_seats(show_session_id, exclude_user=None, now=None) -> int:
+    """Return how many seats of the session are held by unexpired offers."""
+    offers = WaitlistEntry.objects.filter(
+        show_session_id=show_session_id,
+        status=WaitlistEntry.OFFERED,
+        offer_expires_at__gt=now or timezone.now(),
+    )
+    if exclude_user is not None:
+        offers = offers.exclude(user=exclude_user)
+    return offers.aggregate(seats=Sum("seats"))["seats"] or 0
+
+
+def free_seats(show_session_id, exclude_user=None, now=None) -> int:
+    """Return how many seats of the session nobody has booked or holds."""
+    show_session = (
+        ShowSession.objects.filter(id=show_session_id)
+        .annotate(
+            tickets_available=(
+                F("planetarium_dome__rows") * F("planetarium_dome__seats_in_row")
+                - Count("tickets")
+            )
+        )
+        .values_list("tickets_available", flat=True)
+    )
+    return show_session.get() - held_seats(show_session_id, exclude_user, now)
+
+
+def claim_offers(user, show_session_ids) -> None:
+    """Mark the user's offers for the sessions they just booked as claimed."""
+    WaitlistEntry.objects.filter(
+        user=user,
+        show_session_id__in=show_session_ids,
+        status=WaitlistEntry.OFFERED,
+    ).update(status=WaitlistEntry.CLAIMED)
+
+
+def expire_offers(now=None) -> int:
+    """Expire offers whose claim window has passed."""
+    return WaitlistEntry.objects.filter(
+        status=WaitlistEntry.OFFERED,
+        offer_expires_at__lte=now or timezone.now(),
+    ).update(status=WaitlistEntry.EXPIRED)
+
+
+def offer_released_seats(show_session_id, now=None) -> list:
+    """
+    Offer the session's free seats to waiting users in FIFO order.
+
+    Stops at the first entry that does not fit, so nobody is skipped in
+    favour of a smaller party behind them.
+    """
+    now = now or timezone.now()
+    offered = []
+    with transaction.atomic():
+        waiting = (
+            WaitlistEntry.objects.select_for_update()
+            .filter(show_session_id=show_session_id, status=WaitlistEntry.WAITING)
+            .order_by("id")
+        )
+        available = None
+        for entry in waiting:
+            if available is None:
+                available = free_seats(show_session_id, now=now)
+            if entry.seats > available:
+                break
+            available -= entry.seats
+            entry.status = WaitlistEntry.OFFERED
+            entry.offer_expires_at = now + timedelta(
+                seconds=settings.WAITLIST_CLAIM_SECONDS
+            )
+            entry.save(update_fields=("status", "offer_expires_at"))
+            offered.append(entry)
+
+    notifier = get_notifier()
+    for entry in offered:
+        notifier.notify(entry)
+    return offered
+
+
+def process_waitlist(now=None) -> list:
+    """Expire stale offers and offer free seats in every waited-for session."""
+    now = now or timezone.now()
+    expire_offers(now)
+    show_session_ids = (
+        WaitlistEntry.objects.filter(status=WaitlistEntry.WAITING)
+        .order_by("show_session_id")
+        .values_list("show_session_id", flat=True)
+        .distinct()
+    )
+    offered = []
+    for show_session_id in show_session_ids:
+        offered.extend(offer_released_seats(show_session_id, now))
+    return offered